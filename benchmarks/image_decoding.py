@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+#
+#  benchmarks/image_decoding.py
+"""
+Benchmark for reduced-resolution decoding of large source photos.
+"""
+#
+#  Copyright © 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+# stdlib
+import json
+import resource
+import subprocess
+import sys
+import time
+
+# 3rd party
+import click  # nodep
+from domdf_python_tools.paths import PathPlus, TemporaryPathPlus
+from PIL import Image
+
+# this package
+from pottery_map.images import IMAGE_FORMATS, Derivative, ImageSettings, _convert_image
+
+# Synthetic source images: (name, format, size).
+SOURCES = [
+		("24mp", "JPEG", (6000, 4000)),
+		("48mp", "JPEG", (8000, 6000)),
+		("scan", "TIFF", (7000, 5250)),
+		]
+
+
+def _make_sources(directory: PathPlus) -> None:
+	# Noise with a gradient compresses more like a photo than flat colour or pure noise.
+	for name, image_format, size in SOURCES:
+		noise = Image.effect_noise(size, 32)
+		gradient = Image.linear_gradient('L').resize(size)
+		img = Image.merge("RGB", (noise, gradient, Image.blend(noise, gradient, 0.5)))
+		path = directory / f"{name}.{image_format.lower()}"
+		img.save(path, format=image_format, quality=90)
+
+
+def _run(sources: list[PathPlus], output_directory: PathPlus, reduced_decoding: bool, repeat: int) -> dict:
+	settings = ImageSettings()
+	derivatives = {
+			src_path: [
+					Derivative(
+							output_directory / f"{src_path.stem}_{width}px{IMAGE_FORMATS[name].extension}",
+							width,
+							IMAGE_FORMATS[name],
+							) for width in settings.widths for name in settings.formats
+					]
+			for src_path in sources
+			}
+
+	baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	start = time.perf_counter()
+
+	for _ in range(repeat):
+		for src_path in sources:
+			_convert_image(src_path, derivatives[src_path], reduced_decoding=reduced_decoding)
+
+	elapsed = time.perf_counter() - start
+
+	return {
+			"images_per_second": len(sources) * repeat / elapsed,
+			"peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+			"baseline_rss_mib": baseline_rss / 1024,
+			}
+
+
+@click.option("--repeat", type=click.IntRange(min=1), default=3, help="The number of times to convert each image.")
+@click.option("--worker", type=click.Choice(["sources", "full", "reduced"]), hidden=True)
+@click.option("--source", hidden=True)
+@click.command()
+def main(repeat: int = 3, worker: str | None = None, source: str | None = None) -> None:
+	"""
+	Compare the throughput and peak memory usage of full and reduced-resolution decoding.
+
+	Each decoding path runs in a separate process, so their peak memory usage is measured independently.
+	The source images are also created in a separate process, as the peak memory usage of a process
+	is inherited by the processes it starts.
+	"""
+
+	if worker == "sources":
+		assert source is not None
+		_make_sources(PathPlus(source))
+		return
+	elif worker is not None:
+		assert source is not None
+		with TemporaryPathPlus() as output_directory:
+			result = _run([PathPlus(source)], output_directory, worker == "reduced", repeat)
+		print(json.dumps(result))
+		return
+
+	with TemporaryPathPlus() as tmpdir:
+		def run_worker(mode: str, source: PathPlus) -> str:
+			return subprocess.run(
+					[sys.executable, __file__, "--worker", mode, "--source", source, "--repeat", str(repeat)],
+					check=True,
+					capture_output=True,
+					text=True,
+					).stdout
+
+		print("Creating source images...")
+		run_worker("sources", tmpdir)
+
+		for name, image_format, _ in SOURCES:
+			source_path = tmpdir / f"{name}.{image_format.lower()}"
+
+			for mode in ["full", "reduced"]:
+				result = json.loads(run_worker(mode, source_path))
+				print(
+						f"{source_path.name:>10} {mode:>8} decoding: {result['images_per_second']:.2f} images/s; "
+						f"peak RSS {result['peak_rss_mib']:.0f} MiB (baseline {result['baseline_rss_mib']:.0f} MiB)"
+						)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+#
+#  benchmarks/item_memory.py
+"""
+Benchmark for the memory used by a large pottery collection.
+"""
+#
+#  Copyright © 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+# stdlib
+import random
+import time
+import tracemalloc
+
+# 3rd party
+import click  # nodep
+from domdf_python_tools.paths import PathPlus, TemporaryPathPlus
+
+# this package
+from pottery_map.companies import load_companies
+from pottery_map.company import Company
+from pottery_map.pottery import PotteryItem, load_pottery_collection
+from pottery_map.utils import load_toml_files, make_id
+
+MATERIALS = ["Bone China", "Earthenware", "Porcelain", "Stoneware", "Ironstone"]
+TYPES = ["Dinner Plate", "Side Plate", "Sandwich Plate", "Cup", "Saucer", "Bowl", "Jug", "Teapot", "Vase", "Tureen"]
+CATEGORIES = ["Plate", "Cup", "Saucer", "Bowl", "Jug", "Teapot", "Vase", "Other"]
+ERAS = ["c1900-c1920", "c1920-c1940", "c1940-c1960", "c1960-c1980", "c1970-c2000", "c1980-c2000", "1990s", "2000s"]
+DESIGNERS = [f"Designer {idx}" for idx in range(20)] + ['']
+
+
+def _make_collection(directory: PathPlus, items: int, companies: int) -> None:
+	rng = random.Random(1960)
+
+	company_lines = []
+	for idx in range(companies):
+		company_lines.append(f'["Company {idx}"]')
+		company_lines.append(f'factory = "Factory {idx}"')
+		company_lines.append(f'location = {{ latitude = {53 + idx / 100}, longitude = {-2 - idx / 100} }}')
+		company_lines.append('')
+
+	directory.joinpath("companies.toml").write_lines(company_lines)
+
+	item_lines = []
+	for idx in range(items):
+		item_lines.append(f'["Item {idx}"]')
+		item_lines.append(f'company = "Company {rng.randrange(companies)}"')
+		item_lines.append(f'material = "{rng.choice(MATERIALS)}"')
+		item_lines.append(f'type = "{rng.choice(TYPES)}"')
+		item_lines.append(f'design = "Design {idx}"')
+		item_lines.append(f'designer = "{rng.choice(DESIGNERS)}"')
+		item_lines.append(f'category = "{rng.choice(CATEGORIES)}"')
+		item_lines.append(f'era = "{rng.choice(ERAS)}"')
+		item_lines.append('')
+
+	directory.joinpath("pottery.toml").write_lines(item_lines)
+
+
+def _load_plain(pottery_file: PathPlus) -> list[PotteryItem]:
+	# Construct the items directly from the parsed tables, with a company per item and no interning.
+	pottery = []
+
+	for item_id, table in load_toml_files(pottery_file).items():
+		company_name = table.pop("company")
+		company_data = {key: table.pop(key) for key in ("factory", "location", "area", "successor", "defunct") if key in table}
+		company = Company(name=company_name, **company_data)
+		pottery.append(PotteryItem(id=make_id(item_id), toml_id=item_id, company=company, **table))
+
+	return pottery
+
+
+def _measure(directory: PathPlus, plain: bool) -> tuple[float, float]:
+	companies = load_companies(directory / "companies.toml")
+
+	tracemalloc.start()
+	start = time.perf_counter()
+	if plain:
+		pottery = _load_plain(directory / "pottery.toml")
+	else:
+		pottery = load_pottery_collection(directory / "pottery.toml", companies=companies)
+	elapsed = time.perf_counter() - start
+	current, _ = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+
+	assert pottery
+	return current / 1024 / 1024, elapsed
+
+
+@click.option("--items", type=click.IntRange(min=1), default=100_000, help="The number of items in the collection.")
+@click.option("--companies", type=click.IntRange(min=1), default=200, help="The number of companies.")
+@click.command()
+def main(items: int = 100_000, companies: int = 200) -> None:
+	"""
+	Compare the memory retained by a synthetic collection when loaded by :func:`~.load_pottery_collection`
+	against constructing the items directly from the parsed tables, without sharing companies or values.
+
+	Memory is measured with :mod:`tracemalloc` once the collection has loaded,
+	so it excludes the parsed TOML document which is discarded while loading.
+	"""
+
+	with TemporaryPathPlus() as tmpdir:
+		print(f"Creating collection with {items} items...")
+		_make_collection(tmpdir, items, companies)
+
+		for mode in ["plain", "loaded"]:
+			memory, elapsed = _measure(tmpdir, plain=mode == "plain")
+			print(f"{mode:>6}: {memory:.1f} MiB retained; loaded in {elapsed:.1f} s (with tracemalloc)")
+
+
+if __name__ == "__main__":
+	main()
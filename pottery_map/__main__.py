@@ -26,14 +26,69 @@ Generate map showing where items in a pottery collection were manufactured, and
 #  OR OTHER DEALINGS IN THE SOFTWARE.
 #
 
+# stdlib
+from typing import TYPE_CHECKING
+
 # 3rd party
 import click  # nodep
 from consolekit import CONTEXT_SETTINGS, click_group
 from consolekit.options import auto_default_option
 
+if TYPE_CHECKING:
+	# this package
+	from pottery_map.images import ImageSettings
+	from pottery_map.schema import SchemaError
+
 __all__ = ["main"]
 
 
+def _image_settings(
+		image_widths: str | None,
+		image_formats: str | None,
+		download_remote_photos: bool = False,
+		) -> "ImageSettings":
+	# this package
+	from pottery_map.images import ImageSettings
+
+	if download_remote_photos:
+		try:
+			# 3rd party
+			import requests  # nodep  # noqa: F401
+		except ImportError:
+			raise click.UsageError(
+					"--download-remote-photos requires the 'remote' extra: pip install pottery-map[remote]"
+					) from None
+
+	defaults = ImageSettings()
+
+	try:
+		return ImageSettings(
+				widths=[int(width) for width in image_widths.split(',')] if image_widths else defaults.widths,
+				formats=image_formats.split(',') if image_formats else defaults.formats,
+				remote_photos=download_remote_photos,
+				)
+	except ValueError as e:
+		raise click.BadParameter(str(e)) from None
+
+
+def _invalid_collection(errors: "list[SchemaError]") -> click.ClickException:
+	for error in errors:
+		click.echo(str(error), err=True)
+
+	return click.ClickException(f"Found {len(errors)} error{'s' if len(errors) != 1 else ''} in the collection.")
+
+
+_image_widths_help = "Comma-separated widths to convert photos to, in pixels.  [default: 480,960]"
+_image_formats_help = (
+		"Comma-separated formats to convert photos to, in order of preference, from avif, webp and jpeg. "
+		"The last format is the fallback for older browsers.  [default: avif,webp,jpeg]"
+		)
+_download_remote_photos_help = (
+		"Download remote photos and convert them like local photos, rather than linking to them. "
+		"Requires the 'remote' extra."
+		)
+
+
 @auto_default_option(
 		"-i",
 		"--in-dir",
@@ -46,6 +101,25 @@ __all__ = ["main"]
 		is_flag=True,
 		help="Create a standalone map without catalogue pages or additional files.",
 		)
+@auto_default_option(
+		"--force",
+		is_flag=True,
+		help="Re-render every page, even if its inputs are unchanged since the last build.",
+		)
+@auto_default_option(
+		"-j",
+		"--jobs",
+		type=click.IntRange(min=1),
+		help="The number of processes to parse collection shards and render pages with.",
+		)
+@click.option(
+		"--max-decoded-images",
+		type=click.IntRange(min=1),
+		help="The maximum number of decoded images to hold in memory at once.  [default: the number of jobs]",
+		)
+@click.option("--image-widths", help=_image_widths_help)
+@click.option("--image-formats", help=_image_formats_help)
+@auto_default_option("--download-remote-photos", is_flag=True, help=_download_remote_photos_help)
 @click_group(context_settings={**CONTEXT_SETTINGS, "show_default": True}, invoke_without_command=True)
 @click.pass_context
 def main(
@@ -53,6 +127,12 @@ def main(
 		input_directory: str = '.',
 		out_dir: str = "output",
 		standalone: bool = False,
+		force: bool = False,
+		jobs: int = 1,
+		max_decoded_images: int | None = None,
+		image_widths: str | None = None,
+		image_formats: str | None = None,
+		download_remote_photos: bool = False,
 		) -> None:
 	"""
 	Generate map showing where items in a pottery collection were manufactured, and catalogue pages.
@@ -68,19 +148,36 @@ def main(
 	# this package
 	from pottery_map.map import _create_standalone_map
 	from pottery_map.pottery_map import PotteryMap
+	from pottery_map.schema import InvalidCollectionError, read_collection
 
 	set_branca_random_seed("WWRD")
 
 	output_directory = PathPlus(out_dir)
+	image_settings = _image_settings(image_widths, image_formats, download_remote_photos)
 
 	if standalone:
-		html = _create_standalone_map(PathPlus(input_directory))
+		tables, errors = read_collection(input_directory, jobs)
+		if errors:
+			raise _invalid_collection(errors)
+
+		html = _create_standalone_map(PathPlus(input_directory), image_settings, tables)
 		output_directory.joinpath("index.html").write_clean(html)
 		return
 
-	pm = PotteryMap(input_directory=input_directory, output_directory=out_dir)
-	pm.write_output()
+	try:
+		pm = PotteryMap(
+				input_directory=input_directory,
+				output_directory=out_dir,
+				jobs=jobs,
+				max_decoded_images=max_decoded_images,
+				image_settings=image_settings,
+				)
+	except InvalidCollectionError as e:
+		raise _invalid_collection(e.errors) from None
+
 	pm.copy_images()
+	writer = pm.write_output(force=force)
+	print(f"Website: {writer.report()}")
 
 
 @auto_default_option("-o", "--out-dir", help="The output directory.")
@@ -99,5 +196,95 @@ def schemas(out_dir: str = '.') -> None:
 		print(path.as_posix())
 
 
+@auto_default_option(
+		"-i",
+		"--in-dir",
+		"input_directory",
+		help="The input directory, containing the TOML files and images.",
+		)
+@auto_default_option(
+		"-j",
+		"--jobs",
+		type=click.IntRange(min=1),
+		help="The number of processes to validate collection shards with.",
+		)
+@main.command()
+def validate(input_directory: str = '.', jobs: int = 1) -> None:
+	"""
+	Validate the collection's TOML files against their schemas, reporting every error.
+	"""
+
+	# this package
+	from pottery_map.schema import validate_collection
+
+	errors = validate_collection(input_directory, jobs)
+	if errors:
+		raise _invalid_collection(errors)
+
+	print("No errors found.")
+
+
+@auto_default_option(
+		"-i",
+		"--in-dir",
+		"input_directory",
+		help="The input directory, containing the TOML files and images.",
+		)
+@auto_default_option("-o", "--out-dir", help="The output directory.")
+@auto_default_option("--host", help="The address to serve the website on.")
+@auto_default_option("-p", "--port", type=click.INT, help="The port to serve the website on.")
+@auto_default_option(
+		"--watch",
+		is_flag=True,
+		help="Rebuild the website when its inputs change, and reload open pages.",
+		)
+@auto_default_option(
+		"-j",
+		"--jobs",
+		type=click.IntRange(min=1),
+		help="The number of processes to parse collection shards and render pages with.",
+		)
+@click.option("--image-widths", help=_image_widths_help)
+@click.option("--image-formats", help=_image_formats_help)
+@auto_default_option("--download-remote-photos", is_flag=True, help=_download_remote_photos_help)
+@main.command()
+def serve(
+		input_directory: str = '.',
+		out_dir: str = "output",
+		host: str = "localhost",
+		port: int = 8000,
+		watch: bool = False,
+		jobs: int = 1,
+		image_widths: str | None = None,
+		image_formats: str | None = None,
+		download_remote_photos: bool = False,
+		) -> None:
+	"""
+	Build the website and serve it locally.
+	"""
+
+	# 3rd party
+	from domdf_folium_tools import set_branca_random_seed
+
+	# this package
+	from pottery_map.pottery_map import PotteryMap
+	from pottery_map.schema import InvalidCollectionError
+	from pottery_map.serve import serve
+
+	set_branca_random_seed("WWRD")
+
+	try:
+		pm = PotteryMap(
+				input_directory=input_directory,
+				output_directory=out_dir,
+				jobs=jobs,
+				image_settings=_image_settings(image_widths, image_formats, download_remote_photos),
+				)
+	except InvalidCollectionError as e:
+		raise _invalid_collection(e.errors) from None
+
+	serve(pm, host=host, port=port, watch=watch)
+
+
 if __name__ == "__main__":
 	main()
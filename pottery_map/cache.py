@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+#
+#  cache.py
+"""
+SQLite-backed cache of data carried over between builds.
+"""
+#
+#  Copyright © 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import json
+import sqlite3
+import threading
+from types import TracebackType
+from typing import NamedTuple
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+from domdf_python_tools.typing import PathLike
+
+__all__ = ["BuildCache", "ConversionRecord", "ImageRecord", "RemotePhotoRecord"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+	dst_path TEXT PRIMARY KEY,
+	src_path TEXT NOT NULL,
+	params TEXT NOT NULL,
+	mtime REAL NOT NULL,
+	size INTEGER NOT NULL,
+	sha256 TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS conversions (
+	dst_path TEXT PRIMARY KEY,
+	sha256 TEXT NOT NULL,
+	params TEXT NOT NULL,
+	ratio REAL NOT NULL,
+	dst_paths TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS conversions_source ON conversions (sha256, params);
+CREATE TABLE IF NOT EXISTS placeholders (
+	sha256 TEXT PRIMARY KEY,
+	placeholder TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS remote_photos (
+	url TEXT PRIMARY KEY,
+	path TEXT NOT NULL,
+	etag TEXT,
+	last_modified TEXT
+);
+"""
+
+
+class ImageRecord(NamedTuple):
+	"""
+	Details of the source image an output image was converted from.
+	"""
+
+	#: The converted image, as a POSIX path.
+	dst_path: str
+
+	#: The source image, as a POSIX path.
+	src_path: str
+
+	#: The parameters the image was converted with.
+	params: str
+
+	#: The modification time of the source image.
+	mtime: float
+
+	#: The size of the source image, in bytes.
+	size: int
+
+	#: The SHA256 hash hexdigest of the source image.
+	sha256: str
+
+
+class ConversionRecord(NamedTuple):
+	"""
+	The content of a set of converted images, for sharing them between photos with identical sources.
+	"""
+
+	#: The first of the converted images, as a POSIX path.
+	dst_path: str
+
+	#: The SHA256 hash hexdigest of the source image.
+	sha256: str
+
+	#: The parameters the images were converted with.
+	params: str
+
+	#: The width/height ratio of the source image.
+	ratio: float
+
+	#: All of the converted images, as POSIX paths.
+	dst_paths: tuple[str, ...]
+
+
+class RemotePhotoRecord(NamedTuple):
+	"""
+	Details of a downloaded remote photo, for checking whether it has changed.
+	"""
+
+	#: The URL of the photo.
+	url: str
+
+	#: The downloaded file, as a POSIX path.
+	path: str
+
+	#: The ``ETag`` header of the response the photo was downloaded from, if any.
+	etag: str | None
+
+	#: The ``Last-Modified`` header of the response the photo was downloaded from, if any.
+	last_modified: str | None
+
+
+class BuildCache:
+	"""
+	SQLite database caching data between builds, such as the source files converted images were created from,
+	placeholder images, and the validators of downloaded remote photos.
+
+	The database uses write-ahead logging, and changes are committed in batches.
+	An interrupted build therefore loses at most the last uncommitted batch,
+	and never leaves the database in an inconsistent state.
+
+	A single :class:`~.BuildCache` may be shared between threads.
+	Separate processes should each open their own :class:`~.BuildCache` for the same file.
+
+	:param filename: The database file.
+	:param batch_size: The number of changes to make before committing them.
+	"""
+
+	_filename: PathPlus
+	batch_size: int
+
+	def __init__(self, filename: PathLike, batch_size: int = 100):
+		self._filename = PathPlus(filename)
+		self._filename.parent.maybe_make(parents=True)
+		self.batch_size = batch_size
+
+		self._lock = threading.Lock()
+		self._pending = 0
+		self._connection = sqlite3.connect(self._filename, timeout=30, check_same_thread=False)
+		self._connection.execute("PRAGMA journal_mode=WAL")
+		self._connection.execute("PRAGMA synchronous=NORMAL")
+		self._connection.executescript(_SCHEMA)
+
+	def get_image(self, dst_path: str) -> ImageRecord | None:
+		"""
+		Returns the record for the given converted image, if any.
+
+		:param dst_path: The converted image, as a POSIX path.
+		"""
+
+		with self._lock:
+			row = self._connection.execute(
+					"SELECT dst_path, src_path, params, mtime, size, sha256 FROM images WHERE dst_path = ?",
+					(dst_path, ),
+					).fetchone()
+
+		if row is None:
+			return None
+
+		return ImageRecord(*row)
+
+	def set_image(self, record: ImageRecord) -> None:
+		"""
+		Store the record for a converted image, replacing any existing record.
+
+		:param record:
+		"""
+
+		with self._lock:
+			self._connection.execute(
+					"INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?, ?)",
+					tuple(record),
+					)
+			self._changed()
+
+	def get_conversion(self, dst_path: str) -> ConversionRecord | None:
+		"""
+		Returns the record for the given set of converted images, if any.
+
+		:param dst_path: The first of the converted images, as a POSIX path.
+		"""
+
+		with self._lock:
+			row = self._connection.execute(
+					"SELECT dst_path, sha256, params, ratio, dst_paths FROM conversions WHERE dst_path = ?",
+					(dst_path, ),
+					).fetchone()
+
+		if row is None:
+			return None
+
+		return ConversionRecord(row[0], row[1], row[2], row[3], tuple(json.loads(row[4])))
+
+	def find_conversion(self, sha256: str, params: str) -> list[ConversionRecord]:
+		"""
+		Returns the records for images converted from a source with the given hash and parameters.
+
+		:param sha256: The SHA256 hash hexdigest of the source image.
+		:param params: The parameters the images were converted with.
+		"""
+
+		with self._lock:
+			rows = self._connection.execute(
+					"SELECT dst_path, sha256, params, ratio, dst_paths FROM conversions WHERE sha256 = ? AND params = ?",
+					(sha256, params),
+					).fetchall()
+
+		return [
+				ConversionRecord(dst_path, sha256, params, ratio, tuple(json.loads(dst_paths)))
+				for dst_path, sha256, params, ratio, dst_paths in rows
+				]
+
+	def set_conversion(self, record: ConversionRecord) -> None:
+		"""
+		Store the record for a set of converted images, replacing any existing record.
+
+		:param record:
+		"""
+
+		with self._lock:
+			self._connection.execute(
+					"INSERT OR REPLACE INTO conversions VALUES (?, ?, ?, ?, ?)",
+					(*record[:4], json.dumps(record.dst_paths)),
+					)
+			self._changed()
+
+	def delete_conversion(self, dst_path: str) -> None:
+		"""
+		Remove the record for a set of converted images, such as before they are overwritten.
+
+		The removal is committed immediately, along with any pending changes,
+		so an interrupted build can't leave a record for images whose content has since changed.
+
+		:param dst_path: The first of the converted images, as a POSIX path.
+		"""
+
+		with self._lock:
+			self._connection.execute("DELETE FROM conversions WHERE dst_path = ?", (dst_path, ))
+			self._connection.commit()
+			self._pending = 0
+
+	def get_placeholder(self, sha256: str) -> str | None:
+		"""
+		Returns the placeholder image for the source image with the given hash, if any.
+
+		:param sha256: The SHA256 hash hexdigest of the source image.
+		"""
+
+		with self._lock:
+			row = self._connection.execute(
+					"SELECT placeholder FROM placeholders WHERE sha256 = ?",
+					(sha256, ),
+					).fetchone()
+
+		if row is None:
+			return None
+
+		return row[0]
+
+	def set_placeholder(self, sha256: str, placeholder: str) -> None:
+		"""
+		Store the placeholder image for the source image with the given hash.
+
+		:param sha256: The SHA256 hash hexdigest of the source image.
+		:param placeholder: The placeholder image, as a ``data:`` URI.
+		"""
+
+		with self._lock:
+			self._connection.execute("INSERT OR REPLACE INTO placeholders VALUES (?, ?)", (sha256, placeholder))
+			self._changed()
+
+	def get_remote_photo(self, url: str) -> RemotePhotoRecord | None:
+		"""
+		Returns the record for the given downloaded remote photo, if any.
+
+		:param url: The URL of the photo.
+		"""
+
+		with self._lock:
+			row = self._connection.execute(
+					"SELECT url, path, etag, last_modified FROM remote_photos WHERE url = ?",
+					(url, ),
+					).fetchone()
+
+		if row is None:
+			return None
+
+		return RemotePhotoRecord(*row)
+
+	def set_remote_photo(self, record: RemotePhotoRecord) -> None:
+		"""
+		Store the record for a downloaded remote photo, replacing any existing record.
+
+		:param record:
+		"""
+
+		with self._lock:
+			self._connection.execute(
+					"INSERT OR REPLACE INTO remote_photos VALUES (?, ?, ?, ?)",
+					tuple(record),
+					)
+			self._changed()
+
+	def _changed(self) -> None:
+		# Must be called with the lock held.
+		self._pending += 1
+		if self._pending >= self.batch_size:
+			self._connection.commit()
+			self._pending = 0
+
+	def commit(self) -> None:
+		"""
+		Commit any pending changes to the database.
+		"""
+
+		with self._lock:
+			self._connection.commit()
+			self._pending = 0
+
+	def close(self) -> None:
+		"""
+		Commit any pending changes and close the database.
+		"""
+
+		self.commit()
+		self._connection.close()
+
+	def __enter__(self) -> "BuildCache":
+		return self
+
+	def __exit__(
+			self,
+			exc_type: type[BaseException] | None,
+			exc_val: BaseException | None,
+			exc_tb: TracebackType | None,
+			) -> None:
+		self.close()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+#
+#  collection_cache.py
+"""
+Cache of the loaded collection, to skip parsing the TOML files when they are unchanged.
+"""
+#
+#  Copyright © 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import os
+import pickle
+from collections.abc import Iterable
+from typing import Any
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+from domdf_python_tools.typing import PathLike
+
+# this package
+from pottery_map import __version__
+from pottery_map.manifest import hash_data, hash_package_sources
+from pottery_map.utils import get_sha256_hash
+
+__all__ = ["CollectionCache"]
+
+class CollectionCache:
+	"""
+	A pickled copy of the loaded collection, reused while its source files are unchanged.
+
+	The cache is keyed by the hashes of the source files, the package version,
+	and the source code of the package (see :func:`~.hash_package_sources`),
+	as changes to any module may change the cached objects.
+
+	Loading the cache unpickles it, which can run arbitrary code,
+	so it must be stored somewhere only trusted builds write to (not a deployed output directory).
+
+	:param filename: The filename to read and store the cache from/to.
+	"""
+
+	_filename: PathPlus
+
+	def __init__(self, filename: PathLike):
+		self._filename = PathPlus(filename)
+
+	@staticmethod
+	def get_key(source_files: Iterable[PathLike]) -> str:
+		"""
+		Returns the key for a collection loaded from the given files.
+
+		:param source_files:
+		"""
+
+		return hash_data([
+				__version__,
+				hash_package_sources(),
+				{PathPlus(filename).as_posix(): get_sha256_hash(filename) for filename in source_files},
+				])
+
+	def load(self, key: str) -> Any | None:
+		"""
+		Returns the cached collection, or :py:obj:`None` if there isn't one for the given key.
+
+		:param key: The key returned by :meth:`~.get_key`.
+		"""
+
+		try:
+			with self._filename.open("rb") as fp:
+				if fp.readline().decode("UTF-8").strip() != key:
+					return None
+
+				return pickle.load(fp)  # nosec: B301
+		except Exception:  # Missing, corrupt or incompatible; load the collection again.
+			return None
+
+	def save(self, key: str, collection: Any) -> None:
+		"""
+		Store the collection in the cache, replacing any existing cache.
+
+		:param key: The key returned by :meth:`~.get_key`.
+		:param collection:
+		"""
+
+		self._filename.parent.maybe_make(parents=True)
+		tmpfile = self._filename.with_name(self._filename.name + ".tmp")
+
+		with tmpfile.open("wb") as fp:
+			fp.write(f"{key}\n".encode("UTF-8"))
+			pickle.dump(collection, fp, protocol=pickle.HIGHEST_PROTOCOL)
+
+		# Replace the file atomically, so an interrupted build can't leave a truncated cache behind.
+		os.replace(tmpfile, self._filename)
@@ -27,54 +27,186 @@ Function for loading data about companies.
 #
 
 # stdlib
+import math
 import warnings
-from collections.abc import Iterable
+from array import array
+from collections.abc import Iterable, Mapping, Sequence
 from dataclasses import dataclass
+from functools import cached_property
+from typing import TYPE_CHECKING
 
 # 3rd party
-import dom_toml
-import networkx
+import attrs
+from domdf_folium_tools import Coordinates
 from domdf_python_tools.typing import PathLike
 
 # this package
 from pottery_map.company import Company, CompanyData, CompanyItems
 from pottery_map.pottery import PotteryItem
+from pottery_map.utils import load_toml_files
+
+if TYPE_CHECKING:
+	# 3rd party
+	import networkx
+
+__all__ = [
+		"DEFAULT_COLLISION_RADIUS",
+		"Companies",
+		"CompanyIndex",
+		"find_location_collisions",
+		"group_pottery_by_company",
+		"load_companies",
+		"load_companies_from_tables",
+		"make_successor_network",
+		]
+
+#: The default distance in metres within which factory locations collide (see :func:`~.find_location_collisions`).
+DEFAULT_COLLISION_RADIUS = 25.0
+
+# The mean radius of the Earth, in metres.
+_EARTH_RADIUS = 6_371_008.8
+
+
+def find_location_collisions(
+		locations: Mapping[str, Coordinates],
+		radius: float = DEFAULT_COLLISION_RADIUS,
+		) -> list[list[str]]:
+	"""
+	Find groups of locations within the given distance of each other.
 
-__all__ = ["Companies", "group_pottery_by_company", "load_companies", "make_successor_network"]
+	Locations are bucketed into a grid of cells ``radius`` metres across,
+	so each location is only compared with those in the same and neighbouring cells.
+	Groups are transitive: if A is near B and B is near C, all three are in one group.
 
-# TODO: include ultimate (i.e. current) parent. E.g. J&G Meakin is now Wedgwood/WWRD.
+	:param locations: Mapping of names (e.g. company names) to locations.
+	:param radius: The distance in metres within which locations collide.
+		If zero, only identical locations collide.
 
+	:returns: The names in each group of two or more colliding locations, in the order given.
+	"""
 
-def load_companies(companies_file: PathLike = "companies.toml") -> dict[str, Company]:
+	names = list(locations)
+	parents = list(range(len(names)))
+
+	def find(index: int) -> int:
+		while parents[index] != index:
+			parents[index] = parents[parents[index]]
+			index = parents[index]
+		return index
+
+	# Keyed by grid cell, or by exact location if the radius is zero.
+	grid: dict[tuple[float, float], list[int]] = {}
+
+	for index, name in enumerate(names):
+		latitude, longitude = locations[name]["latitude"], locations[name]["longitude"]
+		cell: tuple[float, float]
+		neighbours: list[tuple[float, float]]
+
+		if radius > 0:
+			# Equirectangular projection, which is accurate enough over such short distances.
+			x = _EARTH_RADIUS * math.radians(longitude) * math.cos(math.radians(latitude))
+			y = _EARTH_RADIUS * math.radians(latitude)
+			cell_x, cell_y = math.floor(x / radius), math.floor(y / radius)
+			cell = (cell_x, cell_y)
+			neighbours = [(cell_x + dx, cell_y + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+		else:
+			cell = (latitude, longitude)
+			neighbours = [cell]
+
+		for neighbour in neighbours:
+			for other in grid.get(neighbour, ()):
+				other_location = locations[names[other]]
+				distance = _haversine(
+						latitude,
+						longitude,
+						other_location["latitude"],
+						other_location["longitude"],
+						)
+				if distance <= radius:
+					parents[find(index)] = find(other)
+
+		grid.setdefault(cell, []).append(index)
+
+	groups: dict[int, list[str]] = {}
+	for index, name in enumerate(names):
+		groups.setdefault(find(index), []).append(name)
+
+	return [group for group in groups.values() if len(group) > 1]
+
+
+def _haversine(latitude1: float, longitude1: float, latitude2: float, longitude2: float) -> float:
+	# The great-circle distance between the two points, in metres.
+	phi1, phi2 = math.radians(latitude1), math.radians(latitude2)
+	delta_phi = phi2 - phi1
+	delta_lambda = math.radians(longitude2 - longitude1)
+	a = math.sin(delta_phi / 2)**2 + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2)**2
+	return 2 * _EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def load_companies(
+		companies_file: PathLike | Sequence[PathLike] = "companies.toml",
+		jobs: int = 1,
+		collision_radius: float = DEFAULT_COLLISION_RADIUS,
+		) -> dict[str, Company]:
 	"""
 	Load company data (name, factory, location) from file.
 
-	:param companies_file:
+	A warning is shown for each group of factories within ``collision_radius`` of each other,
+	as their markers would overlap on the map (see :func:`~.find_location_collisions`).
+
+	:param companies_file: The TOML file, or a sequence of shards (see :func:`~.get_toml_files`).
+	:param jobs: The number of processes to parse shards with.
+	:param collision_radius: The distance in metres within which factory locations collide.
+
+	:raises ValueError: If a company is defined in more than one shard.
+	"""
+
+	return load_companies_from_tables(load_toml_files(companies_file, jobs), collision_radius)
+
+
+def load_companies_from_tables(
+		tables: Mapping[str, CompanyData],
+		collision_radius: float = DEFAULT_COLLISION_RADIUS,
+		) -> dict[str, Company]:
+	"""
+	Load company data from the tables of already parsed TOML files (e.g. from :func:`~.read_collection`).
+
+	See :func:`~.load_companies` for details.
+
+	:param tables: Mapping of company names to their tables.
+	:param collision_radius: The distance in metres within which factory locations collide.
 	"""
 
 	companies: dict[str, Company] = {}
-	existing_coordinates = []
 	company_data: CompanyData
 
-	for company_name, company_data in dom_toml.load(companies_file).items():
-		if "location" in company_data:
-			if company_data["location"] in existing_coordinates:
-				warnings.warn(f"Multiple factories at location {company_data['location']!r}")
-			existing_coordinates.append(company_data["location"])
-
+	for company_name, company_data in tables.items():
 		companies[company_name] = Company.from_toml_dict(company_name, **company_data)
 
+	locations = {name: company.location for name, company in companies.items() if company.location}
+
+	for group in find_location_collisions(locations, collision_radius):
+		if len({(locations[name]["latitude"], locations[name]["longitude"]) for name in group}) == 1:
+			warnings.warn(f"Multiple factories at location {locations[group[0]]!r}: {', '.join(group)}")
+		else:
+			warnings.warn(f"Multiple factories within {collision_radius:g} m of each other: {', '.join(group)}")
+
 	return companies
 
 
 def group_pottery_by_company(
-		pottery: list[PotteryItem],
+		pottery: Iterable[PotteryItem],
 		companies: dict[str, Company],
 		) -> dict[str, CompanyItems]:
 	"""
 	Group items in the pottery collection by the company who made them.
 
-	:param pottery: The pottery collection.
+	Each item is given the company object it is grouped under.
+	For companies not in ``companies`` this is the company of the last item made by it.
+	For other companies it is the company from ``companies``, or a copy with missing fields
+	filled in from items (see :func:`~.intern_company`).
+
+	:param pottery: The pottery collection, which may be an iterator (see :func:`~.iter_pottery_collection`).
 	:param companies: Data about companies, giving factory locations.
 	"""
 
@@ -82,18 +214,26 @@ def group_pottery_by_company(
 
 	for item in pottery:
 		company_name = item.company.name
-		if company_name not in pottery_by_company:
-			if company_name in companies:
-				company = companies[company_name]
-			else:
-				# "Ad-hoc" company that only exists in pottery.toml, not in companies.toml
-				company = item.company
-
-			pottery_by_company[company_name] = CompanyItems(company, [])
+		if company_name in companies:
+			if company_name not in pottery_by_company:
+				pottery_by_company[company_name] = CompanyItems(companies[company_name], [])
+
+			company = pottery_by_company[company_name].company
+			if item.company is not company and _fills_in(company, item.company):
+				pottery_by_company[company_name] = CompanyItems(item.company, pottery_by_company[company_name].items)
+		elif company_name not in pottery_by_company or item.company is not pottery_by_company[company_name].company:
+			# "Ad-hoc" company that only exists in pottery.toml, not in companies.toml.
+			# It is replaced with an updated copy as later items give more of its fields (see :func:`~.intern_company`).
+			items = pottery_by_company[company_name].items if company_name in pottery_by_company else []
+			pottery_by_company[company_name] = CompanyItems(item.company, items)
 
-		item.company = pottery_by_company[company_name].company
 		pottery_by_company[company_name].add_item(item)
 
+	for company, items in pottery_by_company.values():
+		for item in items:
+			if item.company is not company:
+				item.company = company
+
 	for company_name, company in companies.items():
 		if company_name not in pottery_by_company:
 			pottery_by_company[company_name] = CompanyItems(company, [])
@@ -101,13 +241,24 @@ def group_pottery_by_company(
 	return pottery_by_company
 
 
-def make_successor_network(companies: dict[str, Company]) -> networkx.DiGraph:
+def _fills_in(company: Company, other: Company) -> bool:
+	# Whether ``other`` is a copy of ``company`` with (some of) its missing fields filled in.
+	return all(
+			getattr(company, field.name) is None or getattr(company, field.name) == getattr(other, field.name)
+			for field in attrs.fields(Company)
+			)
+
+
+def make_successor_network(companies: dict[str, Company]) -> "networkx.DiGraph":
 	"""
 	Make a graph of relationships betweenn companies and their successors/parents.
 
 	:param companies:
 	"""
 
+	# 3rd party
+	import networkx
+
 	graph: networkx.DiGraph = networkx.DiGraph()
 
 	for company_name, company in companies.items():
@@ -119,22 +270,293 @@ def make_successor_network(companies: dict[str, Company]) -> networkx.DiGraph:
 	return graph
 
 
-def _get_item_count(company_item_counts: dict[str, int], successors: Iterable[str]) -> int:
-	return sum([company_item_counts.get(x, 0) for x in successors])
+class CompanyIndex:
+	"""
+	Precomputed relationships between companies and their successors/parents.
+
+	Each company has at most one successor, so the relationships form a forest
+	with the current (ultimate) parents at the roots.
+	The companies are numbered in the same order as the nodes of :func:`~.make_successor_network`,
+	and stored in arrays with their parent, depth, root and position in a pre-order traversal.
+	Every company absorbed by a company (directly or indirectly) is then a contiguous slice of that traversal.
+
+	:param companies: Data about companies, giving their successors.
+
+	:raises ValueError: If a company is its own successor, directly or indirectly.
+	"""
+
+	#: The names of the companies, in the order they were numbered.
+	names: tuple[str, ...]
+
+	_positions: dict[str, int]
+	_parents: array
+	_child_offsets: array
+	_children: array
+	_depths: array
+	_roots: array
+	_starts: array
+	_ends: array
+	_preorder: tuple[str, ...]
+
+	def __init__(self, companies: Mapping[str, Company]):
+		positions: dict[str, int] = {}
+
+		for company_name, company in companies.items():
+			positions.setdefault(company_name, len(positions))
+			if company.successor:
+				positions.setdefault(company.successor, len(positions))
+
+		parents = array('l', [-1]) * len(positions)
+		children: list[list[int]] = [[] for _ in positions]
+
+		for company_name, company in companies.items():
+			if company.successor:
+				position, parent = positions[company_name], positions[company.successor]
+				parents[position] = parent
+				children[parent].append(position)
+
+		self.names = tuple(positions)
+		self._positions = positions
+		self._parents = parents
+		self._child_offsets = array('l', [0])
+		self._children = array('l')
+
+		for company_children in children:
+			self._children.extend(company_children)
+			self._child_offsets.append(len(self._children))
+
+		self._depths = array('l', [0]) * len(positions)
+		self._roots = array('l', [0]) * len(positions)
+		self._starts = array('l', [0]) * len(positions)
+		self._ends = array('l', [0]) * len(positions)
+		preorder: list[int] = []
+
+		for root in range(len(positions)):
+			if parents[root] != -1:
+				continue
+
+			# Iterative depth-first traversal; each node is popped once to enter it and once to leave it.
+			stack = [(root, False)]
+			while stack:
+				position, leaving = stack.pop()
+				if leaving:
+					self._ends[position] = len(preorder)
+					continue
+
+				self._starts[position] = len(preorder)
+				preorder.append(position)
+				self._roots[position] = root
+				if position != root:
+					self._depths[position] = self._depths[parents[position]] + 1
+
+				stack.append((position, True))
+				stack.extend((child, False) for child in reversed(children[position]))
+
+		if len(preorder) != len(positions):
+			# Companies not reachable from a root are in a cycle of successors.
+			visited = set(preorder)
+			in_cycle = [name for position, name in enumerate(self.names) if position not in visited]
+			raise ValueError(f"Companies are their own successors: {', '.join(in_cycle)}")
+
+		self._preorder = tuple(self.names[position] for position in preorder)
+
+	@classmethod
+	def from_graph(cls, graph: "networkx.DiGraph") -> "CompanyIndex":
+		"""
+		Construct from a graph of relationships between companies (see :func:`~.make_successor_network`).
+
+		:param graph:
+
+		:raises ValueError: If a company has more than one successor, or is its own successor.
+		"""
+
+		companies: dict[str, Company] = {}
+
+		for company_name in graph.nodes:
+			successors = list(graph.successors(company_name))
+			if len(successors) > 1:
+				raise ValueError(f"Company {company_name!r} has more than one successor: {', '.join(successors)}")
+			companies[company_name] = Company(name=company_name, successor=successors[0] if successors else None)
+
+		return cls(companies)
+
+	def __contains__(self, company: object) -> bool:
+		return company in self._positions
+
+	def __len__(self) -> int:
+		return len(self.names)
+
+	@property
+	def top_level_companies(self) -> list[str]:
+		"""
+		List of top level companies (those with no successors, e.g. Churchill China).
+		"""
+
+		return [name for name, parent in zip(self.names, self._parents) if parent == -1]
+
+	@property
+	def edges(self) -> list[tuple[str, str]]:
+		"""
+		List of ``(company, successor)`` pairs.
+		"""
+
+		return [(name, self.names[parent]) for name, parent in zip(self.names, self._parents) if parent != -1]
+
+	def get_parent(self, company: str) -> str | None:
+		"""
+		Returns the company which acquired the given company, if any.
+
+		:param company:
+		"""
+
+		parent = self._parents[self._positions[company]]
+		return None if parent == -1 else self.names[parent]
+
+	def get_children(self, company: str) -> list[str]:
+		"""
+		Returns the companies directly acquired by the given company.
+
+		:param company:
+		"""
+
+		position = self._positions[company]
+		children = self._children[self._child_offsets[position]:self._child_offsets[position + 1]]
+		return [self.names[child] for child in children]
+
+	def get_ancestors(self, company: str) -> tuple[str, ...]:
+		"""
+		Returns every company acquired by the given company, directly or indirectly.
+
+		These are the company's ancestors in :func:`~.make_successor_network`.
+
+		:param company:
+		"""
+
+		position = self._positions[company]
+		return self._preorder[self._starts[position] + 1:self._ends[position]]
+
+	def get_group(self, company: str) -> tuple[str, ...]:
+		"""
+		Returns the given company followed by every company it acquired, directly or indirectly.
+
+		:param company:
+		"""
+
+		position = self._positions[company]
+		return self._preorder[self._starts[position]:self._ends[position]]
+
+	def get_descendants(self, company: str) -> list[str]:
+		"""
+		Returns the chain of companies which acquired the given company, ending with its ultimate parent.
+
+		These are the company's descendants in :func:`~.make_successor_network`.
+
+		:param company:
+		"""
+
+		descendants = []
+		parent = self._parents[self._positions[company]]
+
+		while parent != -1:
+			descendants.append(self.names[parent])
+			parent = self._parents[parent]
+
+		return descendants
+
+	def is_ancestor(self, company: str, ancestor: str) -> bool:
+		"""
+		Returns whether ``ancestor`` was acquired by ``company``, directly or indirectly.
+
+		:param company:
+		:param ancestor:
+		"""
+
+		position, other = self._positions[company], self._positions[ancestor]
+		return self._starts[position] < self._starts[other] < self._ends[position]
+
+	def get_depth(self, company: str) -> int:
+		"""
+		Returns the number of acquisitions between the given company and its ultimate parent.
+
+		:param company:
+		"""
+
+		return self._depths[self._positions[company]]
+
+	def get_ultimate_parent(self, company: str) -> str:
+		"""
+		Returns the current parent of the given company, e.g. Wedgwood for J&G Meakin.
+
+		This is the company itself if it was never acquired.
+
+		:param company:
+		"""
+
+		return self.names[self._roots[self._positions[company]]]
+
+	def roll_up(self, counts: Mapping[str, int]) -> dict[str, int]:
+		"""
+		Sum the given counts over each company and every company it acquired, directly or indirectly.
+
+		Companies are visited once, in reverse pre-order, so each company's total is complete
+		before it is added to its parent's.
+
+		:param counts: Mapping of company names to counts. Companies not in the mapping count as zero.
+
+		:returns: Mapping of company names to totals, in the order of :attr:`~.CompanyIndex.names`.
+		"""
+
+		totals = [counts.get(name, 0) for name in self.names]
+
+		for name in reversed(self._preorder):
+			position = self._positions[name]
+			parent = self._parents[position]
+			if parent != -1:
+				totals[parent] += totals[position]
+
+		return dict(zip(self.names, totals))
 
 
 @dataclass
 class Companies:
 	"""
 	Helper class for companies in the collection.
+
+	:param index: Relationships between companies and their successors/parents.
+	:param pottery_by_company: Mapping of all company names to the company objects
+		and items made by the company (if any).
+	:param graph: Graph of relationships between companies, from which ``index`` is built if not given.
+		Accepted for compatibility with code written before :attr:`~.index` was added.
 	"""
 
-	#: Graph showing relationships between companies.
-	graph: networkx.DiGraph
+	#: Relationships between companies and their successors/parents.
+	index: CompanyIndex
 
 	#: Mapping of all company names to the company objects and items made by the company (if any).
 	pottery_by_company: dict[str, CompanyItems]
 
+	def __init__(
+			self,
+			index: CompanyIndex | None = None,
+			pottery_by_company: dict[str, CompanyItems] | None = None,
+			*,
+			graph: "networkx.DiGraph | None" = None,
+			):
+		if pottery_by_company is None:
+			raise TypeError("Companies() missing required argument: 'pottery_by_company'")
+
+		if index is None:
+			if graph is None:
+				raise TypeError("Companies() requires either 'index' or 'graph'")
+			index = CompanyIndex.from_graph(graph)
+
+		if graph is not None:
+			# Reuse the given graph rather than building it again.
+			self.__dict__["graph"] = graph
+
+		self.index = index
+		self.pottery_by_company = pottery_by_company
+
 	@classmethod
 	def from_raw_data(cls, pottery: list, companies: dict[str, Company]) -> "Companies":
 		"""
@@ -143,19 +565,33 @@ class Companies:
 		:param companies: Data about companies, giving factory locations.
 		"""
 
-		graph = make_successor_network(companies)
+		index = CompanyIndex(companies)
 		pottery_by_company = group_pottery_by_company(pottery, companies)
 
 		# Check no extra companies have snuck into or escaped from the graph
-		all_companies: set[str] = {*graph.nodes(), *pottery_by_company}
+		all_companies: set[str] = {*index.names, *pottery_by_company}
 		assert not all_companies.difference(pottery_by_company), all_companies.difference(pottery_by_company)
 		assert all_companies == set(pottery_by_company)
 
 		return cls(
-				graph=graph,
+				index=index,
 				pottery_by_company=pottery_by_company,
 				)
 
+	@cached_property
+	def graph(self) -> "networkx.DiGraph":
+		"""
+		Graph showing relationships between companies.
+		"""
+
+		# 3rd party
+		import networkx
+
+		graph: networkx.DiGraph = networkx.DiGraph()
+		graph.add_nodes_from(self.index.names)
+		graph.add_edges_from(self.index.edges)
+		return graph
+
 	@property
 	def sorted_company_names(self) -> list[str]:
 		"""
@@ -187,7 +623,7 @@ class Companies:
 		List of top level companies (those with no successors, e.g. Churchill China).
 		"""
 
-		return [x for x in self.graph.nodes() if self.graph.out_degree(x) == 0]
+		return self.index.top_level_companies
 
 	@property
 	def represented_companies(self) -> list[str]:
@@ -199,6 +635,16 @@ class Companies:
 
 		return list(self.get_company_item_counts(include_unrepresented=False))
 
+	@cached_property
+	def group_item_counts(self) -> dict[str, int]:
+		"""
+		Mapping of company names to the number of items in the collection
+		by that company and every company it acquired, directly or indirectly.
+		"""
+
+		company_item_counts = self.get_company_item_counts()
+		return {**company_item_counts, **self.index.roll_up(company_item_counts)}
+
 	def get_predecessors(self, company: str | Company) -> list[str]:
 		"""
 		Returns the company's predecessors (company acquired by it).
@@ -211,10 +657,11 @@ class Companies:
 		if isinstance(company, Company):
 			company = company.name
 
-		if not self.graph.has_node(company):
+		if company not in self.index:
 			return []
 
-		return list(self.graph.successors(company))
+		parent = self.index.get_parent(company)
+		return [parent] if parent else []
 
 	def get_successors(self, company: str | Company) -> list[str]:
 		"""
@@ -228,7 +675,39 @@ class Companies:
 		if isinstance(company, Company):
 			company = company.name
 
-		if not self.graph.has_node(company):
+		if company not in self.index:
 			return []
 
-		return list(self.graph.predecessors(company))
+		return self.index.get_children(company)
+
+	def get_group(self, company: str | Company) -> tuple[str, ...]:
+		"""
+		Returns the company followed by every company it acquired, directly or indirectly.
+
+		:param company:
+		"""
+
+		if isinstance(company, Company):
+			company = company.name
+
+		if company not in self.index:
+			return (company, )
+
+		return self.index.get_group(company)
+
+	def get_ultimate_parent(self, company: str | Company) -> str:
+		"""
+		Returns the company's current parent, e.g. Wedgwood for J&G Meakin.
+
+		This is the company itself if it was never acquired.
+
+		:param company:
+		"""
+
+		if isinstance(company, Company):
+			company = company.name
+
+		if company not in self.index:
+			return company
+
+		return self.index.get_ultimate_parent(company)
@@ -29,26 +29,30 @@ Dashboard charts.
 # stdlib
 import json
 from collections import Counter, defaultdict
-from collections.abc import Mapping
+from collections.abc import Callable, Iterable, Mapping
 from operator import itemgetter
-from typing import Any
+from typing import Any, NamedTuple
 
 # 3rd party
-import networkx
 from gradpyent import Gradient
 
 # this package
-from pottery_map.companies import Companies, _get_item_count
+from pottery_map.companies import Companies
 from pottery_map.pottery import PotteryItem
 
 __all__ = [
-		"colour_cycle",
+		"CUBE_DIMENSIONS",
+		"ITEM_DIMENSIONS",
+		"Dimension",
 		"areas_pie_chart",
 		"categories_pie_chart",
+		"colour_cycle",
 		"companies_bar_chart",
+		"count_items",
 		"get_dashboard_data",
 		"gradient_for_data",
 		"groups_pie_chart",
+		"item_cube",
 		"materials_pie_chart",
 		"pie_chart_data",
 		"sort_counts",
@@ -97,10 +101,8 @@ def groups_pie_chart(companies: Companies) -> ChartJSData:
 	other_count = 0
 	company_counts = {}
 	for company in companies.top_level_companies:
-		ancestors: set[str] = networkx.ancestors(companies.graph, company)
-		ancestors.add(company)
-		item_count = _get_item_count(companies.get_company_item_counts(), ancestors)
-		if item_count > 1:
+		item_count = companies.group_item_counts[company]
+		if _is_charted_group(companies, company):
 			company_counts[company] = item_count
 		else:
 			other_count += item_count
@@ -112,6 +114,11 @@ def groups_pie_chart(companies: Companies) -> ChartJSData:
 	return groups_pie_chart_data
 
 
+def _is_charted_group(companies: Companies, company: str) -> bool:
+	# Whether the group gets its own slice in the groups chart, rather than being counted as "Other".
+	return companies.group_item_counts[company] > 1
+
+
 def gradient_for_data(
 		data: list[float],
 		gradient_start: str = "#0000FF",
@@ -203,16 +210,12 @@ def materials_pie_chart(pottery: list[PotteryItem]) -> ChartJSData:
 	:param pottery:
 	"""
 
-	materials = []
-	for item in pottery:
-		material = _strip(item.material)
-		if material:
-			materials.append(material)
+	return _materials_pie_chart(count_items(pottery, ["materials"])["materials"])
 
-	labels, data = sort_counts(Counter(materials))
 
-	materials_pie_chart_data = pie_chart_data(labels, data, colour_cycle)
-	return materials_pie_chart_data
+def _materials_pie_chart(material_counts: Mapping[str, int]) -> ChartJSData:
+	labels, data = sort_counts(material_counts)
+	return pie_chart_data(labels, data, colour_cycle)
 
 
 def types_bar_chart(pottery: list[PotteryItem]) -> ChartJSData:
@@ -224,13 +227,11 @@ def types_bar_chart(pottery: list[PotteryItem]) -> ChartJSData:
 	:param pottery:
 	"""
 
-	item_types = []
-	for item in pottery:
-		item_type = _strip(item.type)
-		if item_type:
-			item_types.append(item_type)
+	return _types_bar_chart(count_items(pottery, ["types"])["types"])
 
-	labels, data = sort_counts(Counter(item_types))
+
+def _types_bar_chart(type_counts: Mapping[str, int]) -> ChartJSData:
+	labels, data = sort_counts(type_counts)
 
 	types_bar_chart_data = {
 			"labels": labels,
@@ -248,30 +249,29 @@ def get_dashboard_data(pottery: list[PotteryItem], companies: Companies) -> dict
 	"""
 	Generate data for the dashboard charts, as JSON strings.
 
+	The items are counted for every chart in a single pass (see :func:`~.count_items`).
+
 	:param pottery:
 	:param companies:
 	"""
 
+	item_counts = count_items(pottery)
+
 	return dict(
 			groups_pie_chart_data=json.dumps(groups_pie_chart(companies)),
 			companies_bar_chart_data=json.dumps(companies_bar_chart(companies)),
-			materials_pie_chart_data=json.dumps(materials_pie_chart(pottery)),
+			materials_pie_chart_data=json.dumps(_materials_pie_chart(item_counts["materials"])),
 			areas_pie_chart_data=json.dumps(areas_pie_chart(companies)),
-			types_bar_chart_data=json.dumps(types_bar_chart(pottery)),
-			categories_pie_chart_data=json.dumps(categories_pie_chart(pottery)),
+			types_bar_chart_data=json.dumps(_types_bar_chart(item_counts["types"])),
+			categories_pie_chart_data=json.dumps(_categories_pie_chart(item_counts["categories"])),
+			item_cube_data=json.dumps(item_cube(pottery, companies), separators=(',', ':')),
 			items_count=len(pottery),
 			companies_count=len(companies.represented_companies),
 			)
 
 
-def areas_pie_chart(companies: Companies) -> ChartJSData:
-	"""
-	Returns data for the pie chart showing areas factories are locted in, such as ``Tunstall``.
-
-	For a chart powered by ChartJS.
-
-	:param companies: Companies
-	"""
+def _count_area_factories(companies: Companies) -> dict[str, int]:
+	# The number of factories in each area.
 
 	areas: dict[str, int] = defaultdict(int)
 
@@ -283,7 +283,19 @@ def areas_pie_chart(companies: Companies) -> ChartJSData:
 		# 	area = "Unknown"
 		areas[company.area] += 1
 
-	# labels, data = sort_counts(areas)
+	return areas
+
+
+def areas_pie_chart(companies: Companies) -> ChartJSData:
+	"""
+	Returns data for the pie chart showing areas factories are locted in, such as ``Tunstall``.
+
+	For a chart powered by ChartJS.
+
+	:param companies: Companies
+	"""
+
+	areas = _count_area_factories(companies)
 
 	other_count = 0
 	for area_name in list(areas.keys()):
@@ -305,13 +317,11 @@ def categories_pie_chart(pottery: list[PotteryItem]) -> ChartJSData:
 	:param pottery:
 	"""
 
-	category_counts: dict[str, int] = defaultdict(int)
+	return _categories_pie_chart(count_items(pottery, ["categories"])["categories"])
 
-	for item in pottery:
-		item_type = item.category.strip().lower().title()
-		if item_type:
-			category_counts[item_type] += 1
 
+def _categories_pie_chart(category_counts: Mapping[str, int]) -> ChartJSData:
+	category_counts = dict(category_counts)
 	other_count = category_counts.pop("Other", 0)
 
 	labels, data = sort_counts(category_counts, other_count)
@@ -341,3 +351,126 @@ def pie_chart_data(labels: list[str], data: list[float], colours: list[str]) ->
 
 def _strip(string: str) -> str:
 	return string.strip().strip('?').strip()
+
+
+class Dimension(NamedTuple):
+	"""
+	A property of items counted for the dashboard charts, such as their material.
+	"""
+
+	#: The name of the item attribute.
+	attribute: str
+
+	#: Converts the attribute's value into the label it is counted under. Empty labels aren't counted.
+	normalise: Callable[[str], str]
+
+
+#: The dimensions counted by :func:`~.count_items`, by name.
+ITEM_DIMENSIONS: dict[str, Dimension] = {
+		"materials": Dimension("material", _strip),
+		"types": Dimension("type", _strip),
+		"categories": Dimension("category", lambda category: category.strip().lower().title()),
+		}
+
+
+def count_items(
+		pottery: Iterable[PotteryItem],
+		dimensions: Iterable[str] = ITEM_DIMENSIONS,
+		) -> dict[str, Counter[str]]:
+	"""
+	Count the items in the collection by each of the given dimensions, in a single pass.
+
+	Each distinct value is only normalised once, however many items share it.
+
+	:param pottery:
+	:param dimensions: The names of the dimensions to count, from :data:`~.ITEM_DIMENSIONS`.
+
+	:returns: Mapping of dimension names to the number of items with each label.
+	"""
+
+	selected = [(name, ITEM_DIMENSIONS[name]) for name in dimensions]
+	raw_counts: dict[str, Counter[str]] = {name: Counter() for name, _ in selected}
+
+	for item in pottery:
+		for name, dimension in selected:
+			raw_counts[name][getattr(item, dimension.attribute)] += 1
+
+	counts: dict[str, Counter[str]] = {}
+
+	for name, dimension in selected:
+		counts[name] = Counter()
+		for value, count in raw_counts[name].items():
+			label = dimension.normalise(value)
+			if label:
+				counts[name][label] += count
+
+	return counts
+
+
+#: The dimensions of :func:`~.item_cube`, in the order of the codes in each cell.
+CUBE_DIMENSIONS = ("groups", "areas", "materials", "categories", "types")
+
+
+def item_cube(pottery: Iterable[PotteryItem], companies: Companies) -> dict[str, Any]:
+	"""
+	Count the items in the collection by every combination of company group, area, material, category and type.
+
+	Each dimension is dictionary coded: the labels are listed once, and cells refer to them by index.
+	The cells are flattened into a single list, with the code for each of :data:`~.CUBE_DIMENSIONS`
+	followed by the number of items, so the dashboard can slice the counts without the items themselves.
+
+	The company group is the company's current (ultimate) parent (see :meth:`Companies.get_ultimate_parent`).
+	Groups and areas are labelled as in :func:`~.groups_pie_chart` and :func:`~.areas_pie_chart`,
+	including those counted as "Other", so the charts show the same labels whether or not they are filtered.
+	Items without a value for a dimension have the empty label, which the dashboard doesn't chart.
+
+	:param pottery:
+	:param companies:
+	"""
+
+	raw_counts: Counter[tuple[str, str, str, str, str]] = Counter()
+
+	for item in pottery:
+		raw_counts[(
+				item.company.name,
+				item.company.area or '',
+				item.material,
+				item.category,
+				item.type,
+				)] += 1
+
+	area_factories = _count_area_factories(companies)
+
+	def group_label(company: str) -> str:
+		group = companies.get_ultimate_parent(company)
+		return group if _is_charted_group(companies, group) else "Other"
+
+	def area_label(area: str) -> str:
+		return area if not area or area_factories[area] >= 2 else "Other"
+
+	normalisers: list[Callable[[str], str]] = [
+			group_label,
+			area_label,
+			ITEM_DIMENSIONS["materials"].normalise,
+			ITEM_DIMENSIONS["categories"].normalise,
+			ITEM_DIMENSIONS["types"].normalise,
+			]
+
+	# Each distinct value is only normalised and coded once.
+	codes: list[dict[str, int]] = [{} for _ in CUBE_DIMENSIONS]
+	labels: list[dict[str, int]] = [{} for _ in CUBE_DIMENSIONS]
+	cells: Counter[tuple[int, ...]] = Counter()
+
+	for values, count in raw_counts.items():
+		cell = []
+		for value, normalise, dimension_codes, dimension_labels in zip(values, normalisers, codes, labels):
+			if value not in dimension_codes:
+				dimension_codes[value] = dimension_labels.setdefault(normalise(value), len(dimension_labels))
+			cell.append(dimension_codes[value])
+		cells[tuple(cell)] += count
+
+	return {
+			"dimensions": list(CUBE_DIMENSIONS),
+			"labels": {name: list(dimension_labels) for name, dimension_labels in zip(CUBE_DIMENSIONS, labels)},
+			"cells": [value for cell, count in sorted(cells.items()) for value in (*cell, count)],
+			}
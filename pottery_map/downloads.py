@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+#
+#  downloads.py
+"""
+Download remote photos, so they can be converted like local photos.
+"""
+#
+#  Copyright © 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+# stdlib
+import os
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from hashlib import sha256
+from typing import TYPE_CHECKING, NamedTuple
+from urllib.parse import urlparse
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from pottery_map import __version__
+from pottery_map.cache import BuildCache, RemotePhotoRecord
+
+if TYPE_CHECKING:
+	# 3rd party
+	import requests  # nodep
+
+__all__ = ["DownloadResult", "PhotoDownloader", "get_download_path"]
+
+#: The ``User-Agent`` header sent when downloading photos.
+USER_AGENT = f"pottery-map/{__version__} (+https://github.com/domdfcoding/pottery-map)"
+
+
+def get_download_path(directory: PathPlus, url: str) -> PathPlus:
+	"""
+	Returns the path the photo at the given URL is downloaded to.
+
+	:param directory: The directory downloaded photos are stored in.
+	:param url:
+	"""
+
+	suffix = PathPlus(urlparse(url).path).suffix.lower()
+	return directory / (sha256(url.encode("UTF-8")).hexdigest()[:32] + suffix)
+
+
+class DownloadResult(NamedTuple):
+	"""
+	The outcome of downloading a single remote photo.
+	"""
+
+	url: str
+
+	#: The path the photo is downloaded to.
+	path: PathPlus
+
+	#: The exception raised if the download failed.
+	exception: Exception | None = None
+
+	#: Whether the previously downloaded photo is unchanged, in which case it was not downloaded again.
+	not_modified: bool = False
+
+
+class PhotoDownloader:
+	"""
+	Downloads remote photos concurrently, using conditional requests to skip those which are unchanged.
+
+	The ``ETag`` and ``Last-Modified`` headers of each download are stored in the :class:`~.BuildCache`,
+	and sent back as ``If-None-Match`` and ``If-Modified-Since`` when the photo is next checked.
+	Unchanged photos are therefore never downloaded again,
+	and their files (and the images converted from them) are left untouched.
+
+	:param directory: The directory to download photos to.
+	:param cache:
+	:param session: The HTTP session to make requests with.
+		Defaults to a new :class:`requests.Session` with a connection pool for each of the ``jobs`` threads.
+	:param jobs: The number of worker threads.
+	:param timeout: The timeout for each request, in seconds.
+
+	:raises ImportError: If no ``session`` is given and :mod:`requests` is not installed.
+	"""
+
+	directory: PathPlus
+	cache: BuildCache
+	session: "requests.Session"
+	jobs: int
+	timeout: float
+
+	def __init__(
+			self,
+			directory: PathPlus,
+			cache: BuildCache,
+			session: "requests.Session | None" = None,
+			jobs: int = 1,
+			timeout: float = 30,
+			):
+		self.directory = PathPlus(directory)
+		self.cache = cache
+		self.jobs = max(jobs, 1)
+		self.timeout = timeout
+
+		if session is None:
+			try:
+				# 3rd party
+				import requests  # nodep
+				from requests.adapters import HTTPAdapter  # nodep
+			except ImportError:
+				raise ImportError("Downloading remote photos requires the 'remote' extra.") from None
+
+			session = requests.Session()
+			adapter = HTTPAdapter(pool_maxsize=self.jobs)
+			session.mount("http://", adapter)
+			session.mount("https://", adapter)
+
+		session.headers.setdefault("User-Agent", USER_AGENT)
+		self.session = session
+
+	def get_path(self, url: str) -> PathPlus:
+		"""
+		Returns the path the photo at the given URL is downloaded to.
+
+		:param url:
+		"""
+
+		return get_download_path(self.directory, url)
+
+	def download(self, url: str) -> DownloadResult:
+		"""
+		Download the photo at the given URL, unless it is unchanged since it was last downloaded.
+
+		:param url:
+		"""
+
+		path = self.get_path(url)
+
+		try:
+			headers = {}
+			record = self.cache.get_remote_photo(url)
+			if record is not None and record.path == path.as_posix() and path.is_file():
+				if record.etag:
+					headers["If-None-Match"] = record.etag
+				if record.last_modified:
+					headers["If-Modified-Since"] = record.last_modified
+
+			with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+				if response.status_code == 304:
+					return DownloadResult(url, path, not_modified=True)
+
+				response.raise_for_status()
+
+				# Write to a temporary file first so an interrupted download never replaces a good one.
+				self.directory.maybe_make(parents=True)
+				tmp_path = path.with_name(f"{path.name}.{os.getpid()}.part")
+				try:
+					with tmp_path.open("wb") as fp:
+						for chunk in response.iter_content(chunk_size=1 << 16):
+							fp.write(chunk)
+					tmp_path.replace(path)
+				finally:
+					tmp_path.unlink(missing_ok=True)
+
+			self.cache.set_remote_photo(
+					RemotePhotoRecord(
+							url=url,
+							path=path.as_posix(),
+							etag=response.headers.get("ETag"),
+							last_modified=response.headers.get("Last-Modified"),
+							),
+					)
+
+		except Exception as e:
+			return DownloadResult(url, path, exception=e)
+
+		return DownloadResult(url, path)
+
+	def download_all(self, urls: Iterable[str]) -> Iterator[DownloadResult]:
+		"""
+		Download the photos at the given URLs, yielding the results in the order the downloads finish.
+
+		:param urls:
+		"""
+
+		if self.jobs == 1:
+			for url in urls:
+				yield self.download(url)
+			return
+
+		with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+			futures = [executor.submit(self.download, url) for url in urls]
+			for future in as_completed(futures):
+				yield future.result()
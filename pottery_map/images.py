@@ -0,0 +1,599 @@
+#!/usr/bin/env python3
+#
+#  images.py
+"""
+Conversion of collection photos for the website.
+"""
+#
+#  Copyright © 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import base64
+import io
+import os
+import shutil
+import threading
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+# 3rd party
+import attrs
+from domdf_python_tools.paths import PathPlus
+from domdf_python_tools.typing import PathLike
+from PIL import Image, features
+
+# this package
+from pottery_map.cache import BuildCache, ConversionRecord, ImageRecord
+from pottery_map.utils import IMG_HEIGHT, IMG_WIDTH, get_photo_path, get_sha256_hash
+
+if TYPE_CHECKING:
+	# this package
+	from pottery_map.pottery import PotteryItem
+
+__all__ = [
+		"IMAGE_FORMATS",
+		"ConversionResult",
+		"Derivative",
+		"ImageConverter",
+		"ImageFormat",
+		"ImageSettings",
+		"Photo",
+		"make_placeholder",
+		]
+
+
+class ImageFormat(NamedTuple):
+	"""
+	A format converted images may be saved in.
+	"""
+
+	#: The Pillow format name.
+	name: str
+
+	#: The Pillow feature which must be available to save the format.
+	feature: str
+
+	#: The file extension, including the leading dot.
+	extension: str
+
+	#: The MIME type, for the ``type`` attribute of ``<source>`` elements.
+	mime_type: str
+
+	#: Keyword arguments for :meth:`PIL.Image.Image.save`.
+	options: dict[str, Any]
+
+	def is_supported(self) -> bool:
+		"""
+		Returns whether the installed version of Pillow can save images in this format.
+		"""
+
+		return bool(features.check(self.feature))
+
+
+#: The formats converted images may be saved in, by name.
+IMAGE_FORMATS: dict[str, ImageFormat] = {
+		"avif": ImageFormat("AVIF", "avif", ".avif", "image/avif", {"quality": 60}),
+		"webp": ImageFormat("WEBP", "webp", ".webp", "image/webp", {}),
+		"jpeg": ImageFormat("JPEG", "jpg", ".jpg", "image/jpeg", {"quality": 85, "optimize": True, "progressive": True}),
+		}
+
+
+def _default_formats() -> tuple[str, ...]:
+	return tuple(name for name in ("avif", "webp", "jpeg") if IMAGE_FORMATS[name].is_supported())
+
+
+def _sort_widths(widths: Iterable[int]) -> tuple[int, ...]:
+	return tuple(sorted(set(widths)))
+
+
+def _lower_formats(formats: Iterable[str]) -> tuple[str, ...]:
+	return tuple(name.strip().lower() for name in formats)
+
+
+def _validate_widths(instance: "ImageSettings", attribute: "attrs.Attribute[tuple[int, ...]]", value: tuple[int, ...]) -> None:
+	if not value:
+		raise ValueError("At least one image width is required.")
+
+	for width in value:
+		if width < 1:
+			raise ValueError(f"Invalid image width {width}")
+
+
+def _validate_formats(instance: "ImageSettings", attribute: "attrs.Attribute[tuple[str, ...]]", value: tuple[str, ...]) -> None:
+	if not value:
+		raise ValueError("At least one image format is required.")
+
+	for name in value:
+		if name not in IMAGE_FORMATS:
+			raise ValueError(f"Unknown image format {name!r}; expected one of {', '.join(IMAGE_FORMATS)}")
+		if not IMAGE_FORMATS[name].is_supported():
+			raise ValueError(f"The installed version of Pillow cannot save {name!r} images.")
+
+
+class Derivative(NamedTuple):
+	"""
+	An image converted from a photo, at one of the configured sizes and formats.
+	"""
+
+	path: PathPlus
+	width: int
+	format: ImageFormat
+
+	@property
+	def height(self) -> int:
+		"""
+		The height of the image, with the same aspect ratio as :data:`~.IMG_WIDTH` and :data:`~.IMG_HEIGHT`.
+		"""
+
+		return round(self.width * IMG_HEIGHT / IMG_WIDTH)
+
+
+class Photo(NamedTuple):
+	"""
+	The URLs of a photo of an item, for use in templates.
+	"""
+
+	#: URL of the largest image in the fallback format, for browsers which don't support ``<picture>``.
+	url: str
+
+	#: ``srcset`` for the fallback format.
+	srcset: str = ''
+
+	#: Pairs of MIME types and ``srcset``\s for the other formats, in order of preference.
+	sources: tuple[tuple[str, str], ...] = ()
+
+	#: A tiny version of the photo as a ``data:`` URI, shown while the photo loads.
+	placeholder: str = ''
+
+
+@attrs.frozen
+class ImageSettings:
+	"""
+	The sizes and formats photos are converted to.
+
+	Every photo is converted to each format at each width, from a single decode of the source image.
+	Pages offer browsers every size in every format, so each downloads the smallest adequate image.
+	Small thumbnails (such as the carousel indicators) are offered only the :attr:`~.thumbnail_widths`,
+	and the map's popups only the :attr:`~.popup_widths`.
+	"""
+
+	#: The widths of the converted images, in pixels.
+	widths: tuple[int, ...] = attrs.field(
+			default=(480, IMG_WIDTH),
+			converter=_sort_widths,
+			validator=_validate_widths,
+			)
+
+	#: The widths of the thumbnails, in pixels.
+	thumbnail_widths: tuple[int, ...] = attrs.field(
+			default=(64, 128),
+			converter=_sort_widths,
+			validator=_validate_widths,
+			)
+
+	#: The widths of the images shown in the map's popups and bottom sheet, in pixels.
+	popup_widths: tuple[int, ...] = attrs.field(
+			default=(320, 640),
+			converter=_sort_widths,
+			validator=_validate_widths,
+			)
+
+	#: The formats of the converted images, in order of preference. The last format is the fallback.
+	formats: tuple[str, ...] = attrs.field(
+			factory=_default_formats,
+			converter=_lower_formats,
+			validator=_validate_formats,
+			)
+
+	#: Whether to download remote photos and convert them like local photos, rather than linking to them.
+	remote_photos: bool = False
+
+	@property
+	def all_widths(self) -> tuple[int, ...]:
+		"""
+		The widths of every image converted from each photo, including the thumbnails and popup images.
+		"""
+
+		return _sort_widths((*self.widths, *self.thumbnail_widths, *self.popup_widths))
+
+	@property
+	def params(self) -> str:
+		"""
+		The parameters images are converted with, for detecting when images need converting again.
+		"""
+
+		return f"widths={','.join(map(str, self.all_widths))};formats={','.join(self.formats)}"
+
+	def get_derivatives(
+			self,
+			pottery_item: "PotteryItem",
+			fileystem_path: PathLike,
+			directory: PathPlus = PathPlus(),
+			) -> list[Derivative]:
+		"""
+		Returns the images to convert the given photo to.
+
+		:param pottery_item:
+		:param fileystem_path: Path to the source image, or its URL.
+		:param directory: The directory the paths are relative to.
+		"""
+
+		derivatives = []
+
+		for width in self.all_widths:
+			for name in self.formats:
+				image_format = IMAGE_FORMATS[name]
+				path = directory / get_photo_path(pottery_item, fileystem_path, width, image_format.extension)
+				derivatives.append(Derivative(path, width, image_format))
+
+		return derivatives
+
+	def get_photo(
+			self,
+			pottery_item: "PotteryItem",
+			fileystem_path: PathLike,
+			root: str = '',
+			placeholder: str = '',
+			widths: Iterable[int] | None = None,
+			) -> Photo:
+		"""
+		Returns the URLs of the images converted from the given photo.
+
+		:param pottery_item:
+		:param fileystem_path: Path to the source image, or its URL.
+		:param root: URL path to the website root.
+		:param placeholder: The photo's placeholder image, as a ``data:`` URI.
+		:param widths: The widths of the images to offer, from :attr:`~.all_widths`. Defaults to :attr:`~.widths`.
+		"""
+
+		widths = self.widths if widths is None else _sort_widths(widths)
+		derivatives = [
+				derivative for derivative in self.get_derivatives(pottery_item, fileystem_path)
+				if derivative.width in widths
+				]
+
+		def get_srcset(image_format: ImageFormat) -> str:
+			return ", ".join(
+					f"{root}{derivative.path.as_posix()} {derivative.width}w"
+					for derivative in derivatives
+					if derivative.format == image_format
+					)
+
+		fallback_format = IMAGE_FORMATS[self.formats[-1]]
+		url = get_photo_path(pottery_item, fileystem_path, widths[-1], fallback_format.extension)
+
+		return Photo(
+				url=f"{root}{url.as_posix()}",
+				srcset=get_srcset(fallback_format),
+				sources=tuple(
+						(IMAGE_FORMATS[name].mime_type, get_srcset(IMAGE_FORMATS[name])) for name in self.formats[:-1]
+						),
+				placeholder=placeholder,
+				)
+
+
+#: The size of placeholder images, in pixels.
+PLACEHOLDER_SIZE = (16, 12)
+
+
+def make_placeholder(image: Image.Image) -> str:
+	"""
+	Returns a tiny version of the given image as a ``data:`` URI, to show while the full image loads.
+
+	The image is saved as a low quality WebP (typically under 100 bytes), or as a PNG if Pillow cannot write WebP.
+
+	:param image:
+	"""
+
+	small = image.resize(PLACEHOLDER_SIZE, Image.Resampling.BOX)
+	if small.mode not in {"RGB", 'L'}:
+		small = small.convert("RGB")
+
+	buffer = io.BytesIO()
+	if features.check("webp"):
+		small.save(buffer, format="WEBP", quality=40)
+		mime_type = "image/webp"
+	else:
+		small.save(buffer, format="PNG", optimize=True)
+		mime_type = "image/png"
+
+	return f"data:{mime_type};base64,{base64.b64encode(buffer.getvalue()).decode('ascii')}"
+
+
+def _convert_image(
+		src_path: PathPlus,
+		derivatives: Sequence[Derivative],
+		reduced_decoding: bool = True,
+		) -> tuple[float, str]:
+	"""
+	Convert the source image to each of the given derivatives, and create its placeholder image.
+
+	:param src_path:
+	:param derivatives:
+	:param reduced_decoding: If :py:obj:`True`, decode JPEGs at the smallest DCT scale (1/2, 1/4 or 1/8)
+		which is still at least as large as the largest derivative.
+		Other large images are shrunk with a fast integer reduction to no less than twice the size of the
+		largest derivative before the final resample.
+		This greatly reduces the time taken and memory used for large camera originals and scans.
+
+	:returns: The width/height ratio of the source image, and its placeholder image (see :func:`~.make_placeholder`).
+	"""
+
+	with Image.open(src_path) as img:
+		img_ratio = img.width / img.height
+		largest = max(derivatives, key=lambda d: d.width)
+
+		if reduced_decoding:
+			# Only affects JPEGs; other formats ignore the draft request.
+			img.draft(None, (largest.width, largest.height))
+
+		decoded: Image.Image = img
+		decoded.load()
+
+		if reduced_decoding:
+			factor = min(decoded.width // largest.width, decoded.height // largest.height) // 2
+			if factor > 1:
+				decoded = decoded.reduce(factor)
+
+		for width in sorted({derivative.width for derivative in derivatives}):
+			same_width = [derivative for derivative in derivatives if derivative.width == width]
+			resized = decoded.resize((width, same_width[0].height))
+
+			for derivative in same_width:
+				image_format = derivative.format
+				if image_format.name == "JPEG" and resized.mode not in {"RGB", 'L'}:
+					resized = resized.convert("RGB")
+
+				resized.save(derivative.path, format=image_format.name, **image_format.options)
+
+		placeholder = make_placeholder(decoded)
+
+	return img_ratio, placeholder
+
+
+def _link_or_copy(src_path: PathPlus, dst_path: PathPlus) -> None:
+	dst_path.unlink(missing_ok=True)
+
+	try:
+		os.link(src_path, dst_path)
+	except OSError:
+		# E.g. a filesystem without hard links, or the two paths are on different devices.
+		shutil.copy2(src_path, dst_path)
+
+
+class ConversionResult(NamedTuple):
+	"""
+	The outcome of converting a single image.
+	"""
+
+	src_path: PathPlus
+
+	#: The images converted from the source image.
+	derivatives: Sequence[Derivative]
+
+	#: The width/height ratio of the source image, or :py:obj:`None` if the conversion failed.
+	ratio: float | None = None
+
+	#: The exception raised if the conversion failed.
+	exception: Exception | None = None
+
+	#: Whether the existing converted images are up to date, in which case the image was not converted.
+	up_to_date: bool = False
+
+	#: Details of the source image, to store in the :class:`~.BuildCache` once the conversion has been accepted.
+	record: ImageRecord | None = None
+
+
+class ImageConverter:
+	"""
+	Converts images concurrently in a pool of worker threads.
+
+	Pillow releases the GIL while decoding, resizing and encoding images,
+	so threads convert images in parallel without the overhead of sending image data between processes.
+
+	Each source image is decoded once, and resized and encoded to each of its derivatives in turn.
+	A placeholder image is made from the same decoded pixels and stored in the cache (see :func:`~.make_placeholder`).
+	Photos with identical sources (such as the same backstamp photo used for several items) are only converted once;
+	the other photos' images are hard links to the same files, or copies where hard links are not supported.
+
+	:param jobs: The number of worker threads.
+	:param max_decoded_images: The maximum number of decoded images to hold in memory at once.
+		Defaults to ``jobs``.
+	:param cache: Cache used to skip images whose source and conversion parameters are unchanged,
+		and to find existing images converted from identical sources.
+	:param settings: The sizes and formats images are converted to.
+	"""
+
+	jobs: int
+	max_decoded_images: int
+	cache: BuildCache | None
+	settings: ImageSettings
+
+	def __init__(
+			self,
+			jobs: int = 1,
+			max_decoded_images: int | None = None,
+			cache: BuildCache | None = None,
+			settings: ImageSettings | None = None,
+			):
+		self.jobs = max(jobs, 1)
+		self.max_decoded_images = max(max_decoded_images or self.jobs, 1)
+		self.cache = cache
+		self.settings = settings or ImageSettings()
+		self._decode_slots = threading.BoundedSemaphore(self.max_decoded_images)
+		self._source_locks: dict[str, threading.Lock] = {}
+		self._source_locks_lock = threading.Lock()
+
+	@property
+	def params(self) -> str:
+		"""
+		The parameters images are converted with.
+		"""
+
+		return self.settings.params
+
+	def is_up_to_date(self, src_path: PathPlus, derivatives: Sequence[Derivative]) -> tuple[bool, ImageRecord]:
+		"""
+		Returns whether the converted images are up to date with their source, and the current details of the source.
+
+		The source's modification time and size are compared with the cached values first,
+		falling back to comparing its SHA256 hash if they differ.
+
+		:param src_path: The image to convert.
+		:param derivatives: The images to convert it to.
+		"""
+
+		stat = src_path.stat()
+		current = ImageRecord(
+				dst_path=derivatives[0].path.as_posix(),
+				src_path=src_path.as_posix(),
+				params=self.params,
+				mtime=stat.st_mtime,
+				size=stat.st_size,
+				sha256='',
+				)
+
+		record = self.cache.get_image(current.dst_path) if self.cache is not None else None
+
+		if (
+				record is not None and record[:3] == current[:3]
+				and all(derivative.path.is_file() for derivative in derivatives)
+				):
+			if (record.mtime, record.size) == (current.mtime, current.size):
+				return True, record
+
+			current = current._replace(sha256=get_sha256_hash(src_path))
+			if current.sha256 == record.sha256:
+				# Touched but unchanged; store the new modification time to avoid hashing it again next time.
+				assert self.cache is not None
+				self.cache.set_image(current)
+				return True, current
+
+		if not current.sha256:
+			current = current._replace(sha256=get_sha256_hash(src_path))
+
+		return False, current
+
+	def convert(self, src_path: PathPlus, derivatives: Sequence[Derivative]) -> ConversionResult:
+		"""
+		Convert a single image, waiting if the maximum number of images are already decoded.
+
+		The image is not converted if it is up to date according to the cache.
+
+		:param src_path: The image to convert.
+		:param derivatives: The images to convert it to.
+		"""
+
+		try:
+			up_to_date, record = self.is_up_to_date(src_path, derivatives)
+			if up_to_date and (self.cache is None or self.cache.get_placeholder(record.sha256) is not None):
+				return ConversionResult(src_path, derivatives, up_to_date=True)
+
+			for directory in {derivative.path.parent for derivative in derivatives}:
+				directory.maybe_make(parents=True)
+
+			# Photos with identical sources are converted one at a time, so later ones can reuse the first's images.
+			with self._source_lock(record.sha256):
+				if self.cache is not None:
+					self.cache.delete_conversion(record.dst_path)
+
+				ratio = self._link_existing(record, derivatives)
+
+				if ratio is None:
+					for derivative in derivatives:
+						# Don't overwrite files which may be hard linked from other photos' images.
+						derivative.path.unlink(missing_ok=True)
+
+					with self._decode_slots:
+						ratio, placeholder = _convert_image(src_path, derivatives)
+
+					if self.cache is not None:
+						self.cache.set_placeholder(record.sha256, placeholder)
+
+				if self.cache is not None:
+					self.cache.set_conversion(
+							ConversionRecord(
+									dst_path=record.dst_path,
+									sha256=record.sha256,
+									params=record.params,
+									ratio=ratio,
+									dst_paths=tuple(derivative.path.as_posix() for derivative in derivatives),
+									),
+							)
+
+		except Exception as e:
+			return ConversionResult(src_path, derivatives, exception=e)
+
+		return ConversionResult(src_path, derivatives, ratio=ratio, record=record)
+
+	def _source_lock(self, sha256: str) -> threading.Lock:
+		with self._source_locks_lock:
+			return self._source_locks.setdefault(sha256, threading.Lock())
+
+	def _link_existing(self, record: ImageRecord, derivatives: Sequence[Derivative]) -> float | None:
+		"""
+		Link the given images to existing images converted from an identical source, if there are any.
+
+		:param record: Details of the source image.
+		:param derivatives: The images to convert it to.
+
+		:returns: The width/height ratio of the source image, or :py:obj:`None` if there are no existing images.
+		"""
+
+		if self.cache is None or self.cache.get_placeholder(record.sha256) is None:
+			# Converting the image again also creates the missing placeholder.
+			return None
+
+		for existing in self.cache.find_conversion(record.sha256, record.params):
+			existing_paths = [PathPlus(path) for path in existing.dst_paths]
+			if len(existing_paths) != len(derivatives) or not all(path.is_file() for path in existing_paths):
+				continue
+
+			for existing_path, derivative in zip(existing_paths, derivatives):
+				_link_or_copy(existing_path, derivative.path)
+
+			return existing.ratio
+
+		return None
+
+	def convert_all(
+			self,
+			conversions: Iterable[tuple[PathPlus, Sequence[Derivative]]],
+			) -> Iterator[ConversionResult]:
+		"""
+		Convert the given images, yielding the results in the order the conversions finish.
+
+		:param conversions: Pairs of source paths and the images to convert them to.
+		"""
+
+		if self.jobs == 1:
+			for src_path, derivatives in conversions:
+				yield self.convert(src_path, derivatives)
+			return
+
+		with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+			futures = [
+					executor.submit(self.convert, src_path, derivatives) for src_path, derivatives in conversions
+					]
+			for future in as_completed(futures):
+				yield future.result()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+#
+#  manifest.py
+"""
+Build manifest recording the inputs each output page was rendered from.
+"""
+#
+#  Copyright © 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import json
+import os
+from collections.abc import Iterable, Mapping
+from hashlib import sha256
+from typing import Any
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+from domdf_python_tools.typing import PathLike
+
+__all__ = ["BuildManifest", "hash_data", "hash_package_sources"]
+
+
+def hash_data(data: Any) -> str:
+	"""
+	Returns the SHA256 hash hexdigest for the given JSON-serialisable data.
+
+	:param data:
+	"""
+
+	serialised = json.dumps(data, sort_keys=True, default=str)
+	return sha256(serialised.encode("UTF-8")).hexdigest()
+
+
+def hash_package_sources() -> str:
+	"""
+	Returns the SHA256 hash hexdigest of the source code of every module in this package.
+
+	Outputs depending on the code which generates them are stale when the hash changes,
+	even if the package version (which doesn't change during development) is the same.
+	"""
+
+	package_directory = PathPlus(__file__).parent
+	hash_obj = sha256()
+
+	for module in sorted(package_directory.rglob("*.py")):
+		hash_obj.update(module.relative_to(package_directory).as_posix().encode("UTF-8"))
+		hash_obj.update(b"\0")
+		hash_obj.update(module.read_bytes())
+		hash_obj.update(b"\0")
+
+	return hash_obj.hexdigest()
+
+
+class BuildManifest:
+	"""
+	Records, for each output file, the content hashes of the inputs it was rendered from.
+
+	Inputs are identified by a key such as ``item:<id>``, ``company:<name>`` or ``template:<name>``.
+
+	:param filename: The filename to read and store data to/from.
+	"""
+
+	_filename: PathPlus
+	_pages: dict[str, dict[str, str]]
+
+	def __init__(self, filename: PathLike):
+		self._filename = PathPlus(filename)
+
+		try:
+			self._pages = self._filename.load_json()
+		except Exception:  # Missing or corrupt; rebuild everything.
+			self._pages = {}
+
+	def is_up_to_date(self, output_file: str, dependencies: Mapping[str, str]) -> bool:
+		"""
+		Returns whether the given output file was last rendered from exactly the given inputs.
+
+		:param output_file: The output filename, relative to the output directory.
+		:param dependencies: Mapping of input keys to their current content hashes.
+		"""
+
+		return self._pages.get(output_file) == dependencies
+
+	def record(self, output_file: str, dependencies: Mapping[str, str]) -> None:
+		"""
+		Record the inputs the given output file was rendered from.
+
+		:param output_file: The output filename, relative to the output directory.
+		:param dependencies: Mapping of input keys to their current content hashes.
+		"""
+
+		self._pages[output_file] = dict(dependencies)
+
+	def prune(self, output_files: Iterable[str]) -> list[str]:
+		"""
+		Remove entries for output files which are no longer generated.
+
+		:param output_files: The output files generated by the current build.
+
+		:returns: The output files whose entries were removed, which should be deleted.
+		"""
+
+		keep = set(output_files)
+		removed = []
+
+		for output_file in list(self._pages):
+			if output_file not in keep:
+				del self._pages[output_file]
+				removed.append(output_file)
+
+		return removed
+
+	def write_file(self) -> None:
+		"""
+		Write the manifest to disk.
+		"""
+
+		tmpfile = self._filename.with_name(self._filename.name + ".tmp")
+		tmpfile.dump_json(self._pages, indent=2, sort_keys=True)
+
+		# Replace the file atomically, so an interrupted build can't leave a truncated manifest behind.
+		os.replace(tmpfile, self._filename)
@@ -28,7 +28,8 @@ The map itself.
 
 # stdlib
 import sys
-from collections.abc import Iterable
+from collections.abc import Iterable, Mapping
+from typing import Any
 
 # 3rd party
 import folium
@@ -47,6 +48,7 @@ from folium_zoom_state import BasemapState, ZoomStateJS, ZoomStateMap
 
 # this package
 from pottery_map.companies import CompanyItems
+from pottery_map.images import ImageSettings
 from pottery_map.nls_basemaps import os10k, os25inch, os1250, os2500
 from pottery_map.templates import render_template
 from pottery_map.utils import make_id
@@ -153,14 +155,24 @@ class Popup(folium.Popup):
 		self.popup_content = html
 
 
-def make_map(pottery_collection: Iterable[CompanyItems], standalone: bool = True) -> Map:
+def make_map(
+		pottery_collection: Iterable[CompanyItems],
+		standalone: bool = True,
+		image_settings: ImageSettings | None = None,
+		placeholders: Mapping[str, str] | None = None,
+		) -> Map:
 	"""
 	Make the pottery collection folium map.
 
 	:param pottery_collection:
 	:param standalone: Create a standalone map with embedded CSS,
+	:param image_settings: The sizes and formats photos are converted to.
+	:param placeholders: Mapping of photo paths (after parameter substitution) to their placeholder images.
 	"""
 
+	if image_settings is None:
+		image_settings = ImageSettings()
+
 	MAX_ZOOM = 20
 
 	osm_tiles = set_id(
@@ -216,6 +228,8 @@ def make_map(pottery_collection: Iterable[CompanyItems], standalone: bool = True
 				company_data=company_data,
 				standalone=standalone,
 				make_id=make_id,
+				image_settings=image_settings,
+				placeholders=placeholders,
 				).splitlines()
 
 		company_id = make_id(company.name)
@@ -261,17 +275,27 @@ def make_map(pottery_collection: Iterable[CompanyItems], standalone: bool = True
 	return m
 
 
-def _create_standalone_map(input_directory: PathPlus) -> str:
+def _create_standalone_map(
+		input_directory: PathPlus,
+		image_settings: ImageSettings | None = None,
+		tables: dict[str, dict[str, Any]] | None = None,
+		) -> str:
+	# The tables (e.g. from read_collection), if the files have already been parsed.
 
 	# this package
-	from pottery_map.companies import group_pottery_by_company, load_companies
-	from pottery_map.pottery import load_pottery_collection
+	from pottery_map.companies import group_pottery_by_company, load_companies, load_companies_from_tables
+	from pottery_map.pottery import iter_pottery_collection, iter_pottery_from_tables
+
+	if tables is None:
+		companies = load_companies(input_directory / "companies.toml")
+		pottery = iter_pottery_collection(input_directory / "pottery.toml", companies=companies)
+	else:
+		companies = load_companies_from_tables(tables["companies"])
+		pottery = iter_pottery_from_tables(tables["pottery"], companies)
 
-	pottery = load_pottery_collection(input_directory / "pottery.toml")
-	companies = load_companies(input_directory / "companies.toml")
 	pottery_by_company = group_pottery_by_company(pottery, companies)
 
-	m = make_map(pottery_by_company.values())
+	m = make_map(pottery_by_company.values(), image_settings=image_settings)
 	m.add_css_link("bootstrap_css", "https://cdn.jsdelivr.net/npm/bootstrap@5.3.8/dist/css/bootstrap.min.css")
 	m.add_js_link("bootstrap_js", "https://cdn.jsdelivr.net/npm/bootstrap@5.3.8/dist/js/bootstrap.bundle.min.js")
 
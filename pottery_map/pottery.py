@@ -27,26 +27,60 @@ Classes to represent pottery collection.
 #
 
 # stdlib
-from collections.abc import Sequence
-from typing import ClassVar
+import sys
+import warnings
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from functools import cached_property
+from typing import Any, ClassVar
 from urllib.parse import urlparse
 
 # 3rd party
 import attrs
-import dom_toml
 from domdf_python_tools.typing import PathLike
 
 # this package
 from pottery_map.company import Company
-from pottery_map.utils import filter_keys, get_photo_path, make_id
+from pottery_map.images import ImageSettings, Photo
+from pottery_map.utils import load_toml_files, make_id
 
-__all__ = ["PotteryItem", "load_pottery_collection"]
+__all__ = [
+		"PotteryItem",
+		"intern_company",
+		"iter_pottery_collection",
+		"iter_pottery_from_tables",
+		"load_pottery_collection",
+		]
 
+# Keys in item tables which describe the item's company.
+_COMPANY_FIELDS = frozenset({"factory", "location", "area", "successor", "defunct"})
 
-@attrs.define
+# Cached properties of PotteryItem, which are discarded when a field is set.
+_DERIVED_VALUES = ("description", "_substituted_photo_paths", "_photos")
+
+# Keys in item tables whose values are repeated across many items, e.g. "Bone China".
+_INTERNED_FIELDS = frozenset({"material", "type", "designer", "category", "era"})
+
+
+def _clear_derived_values(instance: "PotteryItem", attribute: attrs.Attribute, value: Any) -> Any:
+	# Discard values derived from the item's fields when any field is set.
+	for name in _DERIVED_VALUES:
+		try:
+			object.__delattr__(instance, name)
+		except AttributeError:  # Not computed yet.
+			pass
+
+	return value
+
+
+@attrs.define(on_setattr=_clear_derived_values)
 class PotteryItem:
 	"""
 	An item in the pottery collection.
+
+	Values derived from the item's fields, such as its :attr:`~.description` and photo URLs,
+	are computed once and cached until a field is set.
+	Changes made inside a field (e.g. appending to :attr:`~.photo_paths`, or changing the :attr:`~.company`)
+	are not detected.
 	"""
 
 	# TODO: move company parts into an instance of the Company class.
@@ -73,7 +107,7 @@ class PotteryItem:
 	_schema_table_name_field: ClassVar[str] = "id"
 	_schema_exclude_fields: ClassVar[Sequence[str]] = ("toml_id", )
 
-	@property
+	@cached_property
 	def description(self) -> str:
 		"""
 		A description of the item, including its material, diameter (if applicable), and type (e.g. plate).
@@ -95,33 +129,75 @@ class PotteryItem:
 
 		return ' '.join(parts)
 
-	def get_photo_urls(self, root: str = '') -> list[str]:
+	def get_photo_urls(self, root: str = '', settings: ImageSettings | None = None) -> list[str]:
 		"""
 		Returns the list of photo URLs with parameters substituted.
 
+		For local photos this is the largest image in the fallback format.
+
+		:param root: URL path to the website root.
+		:param settings: The sizes and formats photos are converted to.
+		"""
+
+		return [photo.url for photo in self.get_photos(root, settings)]
+
+	def get_photos(
+			self,
+			root: str = '',
+			settings: ImageSettings | None = None,
+			placeholders: Mapping[str, str] | None = None,
+			widths: Iterable[int] | None = None,
+			) -> list[Photo]:
+		"""
+		Returns the URLs of the sizes and formats of each photo, with parameters substituted.
+
 		:param root: URL path to the website root.
+		:param settings: The sizes and formats photos are converted to.
+		:param placeholders: Mapping of photo paths (after parameter substitution) to their placeholder images.
+			Remote photos without a placeholder were not downloaded and converted, so are linked to directly.
+		:param widths: The widths of the images to offer, such as :attr:`ImageSettings.thumbnail_widths <.ImageSettings.thumbnail_widths>`.
+			Defaults to :attr:`ImageSettings.widths <.ImageSettings.widths>`.
 		"""
 
-		# TODO: copy files (maybe converting to webp or avif) from the photo_url path (if not a URL) and put into subfolder of images folder with same ID as the item (filename itself stays the same)
+		if settings is None:
+			settings = ImageSettings()
+
+		if placeholders is None:
+			placeholders = {}
 
-		photo_urls = []
+		paths = self._substituted_photo_paths
+		key = (
+				root,
+				settings,
+				None if widths is None else tuple(widths),
+				tuple(placeholders.get(path, '') for path in paths),
+				)
 
-		for path in self.get_substituted_photo_paths():
-			parts = urlparse(path)
-			if parts.scheme and parts.netloc:
-				# It's a URL
-				photo_urls.append(path)
-			else:
-				# Local filesystem path; will be copied into images/{id}
-				photo_urls.append(f"{root}{get_photo_path(self, path)}")
+		if key not in self._photos:
+			photos = []
 
-		return photo_urls
+			for path, placeholder in zip(paths, key[3]):
+				parts = urlparse(path)
+				if parts.scheme and parts.netloc and not (settings.remote_photos and placeholder):
+					# It's a URL, which is linked to unless it was downloaded and converted (and so has a placeholder)
+					photos.append(Photo(url=path))
+				else:
+					# Local filesystem path, or downloaded remote photo; will be converted into images/{id}
+					photos.append(settings.get_photo(self, path, root, placeholder, widths))
+
+			self._photos[key] = tuple(photos)
+
+		return list(self._photos[key])
 
 	def get_substituted_photo_paths(self) -> list[str]:
 		"""
 		Returns a list of photo paths after parameter substitution.
 		"""
 
+		return list(self._substituted_photo_paths)
+
+	@cached_property
+	def _substituted_photo_paths(self) -> tuple[str, ...]:
 		photo_paths = []
 		params = attrs.asdict(self)
 		params.pop("photo_paths")
@@ -130,7 +206,12 @@ class PotteryItem:
 			path = (path.format_map(params))
 			photo_paths.append(path.strip())
 
-		return photo_paths
+		return tuple(photo_paths)
+
+	@cached_property
+	def _photos(self) -> dict[tuple[Any, ...], tuple[Photo, ...]]:
+		# Cache for :meth:`~.get_photos`, keyed by its arguments.
+		return {}
 
 	@property
 	def has_notes(self) -> bool:
@@ -144,38 +225,163 @@ class PotteryItem:
 	def from_toml_dict(
 			cls,
 			id: str,  # noqa: A002  # pylint: disable=redefined-builtin
+			companies: dict[str, Company] | None = None,
+			given_fields: dict[str, set[str]] | None = None,
 			**data,
 			) -> "PotteryItem":
 		r"""
 		Create from a table in a TOML file.
 
 		:param id: Unique identifier for the item.
+		:param companies: Companies already loaded, by name.
+			If given, the item shares the company object with that name (see :func:`~.intern_company`),
+			rather than having its own.
+		:param given_fields: The fields given for companies created from items' fields (see :func:`~.intern_company`).
 		:param \*\*data:
 		"""
 
-		company_arg_names = {"factory", "location", "area", "successor", "defunct"}
-		company_data = filter_keys(data, keep_keys=company_arg_names)
-		company = Company(name=data["company"], **company_data)
-
-		data = filter_keys(data, remove_keys={"company", *company_arg_names})
+		# Split the company's fields from the item's in a single pass.
+		company_data: dict[str, Any] = {}
+		item_data: dict[str, Any] = {}
+		for key, value in data.items():
+			if key in _COMPANY_FIELDS:
+				company_data[key] = value
+			elif key in _INTERNED_FIELDS and isinstance(value, str):
+				# Share one string object between the many items with the same value.
+				item_data[key] = sys.intern(value)
+			elif key != "company":
+				item_data[key] = value
+
+		if companies is None:
+			company = Company(name=data["company"], **company_data)
+		else:
+			company = intern_company(companies, data["company"], company_data, id, given_fields)
 
 		return cls(
 				id=make_id(id),
 				toml_id=id,
 				company=company,
-				**data,
+				**item_data,
 				)
 
 
-def load_pottery_collection(pottery_file: PathLike = "pottery.toml") -> list[PotteryItem]:
+def intern_company(
+		companies: dict[str, Company],
+		name: str,
+		company_data: Mapping[str, Any],
+		item_id: str = '',
+		given_fields: dict[str, set[str]] | None = None,
+		) -> Company:
 	"""
-	Load a pottery collection from a TOML file.
+	Returns the company with the given name, creating it from the given fields if it isn't in ``companies``.
+
+	Companies created from items' fields are recorded in ``given_fields``,
+	along with the fields which were given for them.
+	Fields given for such a company by later items are merged into it if no earlier item gave them.
+	Other companies (e.g. from ``companies.toml``) are authoritative, but items may fill in their missing (:py:obj:`None`) fields.
+	Merged fields are applied by replacing the company in ``companies`` with an updated copy;
+	the existing object is never modified.
+	A warning is shown if a field conflicts with the company's existing value (where neither value is :py:obj:`None`).
+
+	:param companies: Companies already loaded, by name. New companies are added to this mapping.
+	:param name: The name of the company.
+	:param company_data: The company's fields from an item table (e.g. ``factory``).
+	:param item_id: The item the fields come from, for warnings.
+	:param given_fields: Mapping of the names of companies created from items' fields to the fields given for them.
+		If :py:obj:`None` only missing fields are filled in.
+	"""
+
+	if name not in companies:
+		companies[name] = Company(name=name, **company_data)
+		if given_fields is not None:
+			given_fields[name] = set(company_data)
+		return companies[name]
+
+	company = companies[name]
+	company_given_fields = given_fields.get(name) if given_fields is not None else None
+	merged_data: dict[str, Any] = {}
+
+	for field_name, value in company_data.items():
+		existing = getattr(company, field_name)
+		if existing == value or value is None:
+			continue
+		elif existing is None or (company_given_fields is not None and field_name not in company_given_fields):
+			merged_data[field_name] = value
+		else:
+			warnings.warn(
+					f"Item {item_id!r} gives {field_name} {value!r} for {name!r}, "
+					f"which conflicts with the existing value {existing!r}; using {existing!r}"
+					)
+
+	if merged_data:
+		company = companies[name] = attrs.evolve(company, **merged_data)
+		if company_given_fields is not None:
+			company_given_fields.update(merged_data)
+
+	return company
+
+
+def iter_pottery_collection(
+		pottery_file: PathLike | Sequence[PathLike] = "pottery.toml",
+		jobs: int = 1,
+		companies: Mapping[str, Company] | None = None,
+		) -> Iterator[PotteryItem]:
+	"""
+	Load a pottery collection from a TOML file, yielding the items one at a time.
+
+	The whole file (or every shard) is parsed before the first item is yielded,
+	so this doesn't reduce the memory used by the parser.
+	Each item is only created when it is requested, and its table is then discarded.
+	Items made by the same company share one :class:`~.Company` object,
+	which is taken from ``companies`` if the company is listed there (see :func:`~.intern_company`).
+	Companies are replaced with an updated copy when a later item gives more of their fields;
+	:func:`~.group_pottery_by_company` then gives every item the latest copy.
+
+	:param pottery_file: The TOML file, or a sequence of shards (see :func:`~.get_toml_files`).
+	:param jobs: The number of processes to parse shards with.
+	:param companies: Data about companies (see :func:`~.load_companies`). This mapping is not modified.
 
-	:param pottery_file:
+	:raises ValueError: If an item is defined in more than one shard.
 	"""
 
-	pottery = []
-	for item_id, item in dom_toml.load(pottery_file).items():
-		pottery.append(PotteryItem.from_toml_dict(item_id, **item))
+	return iter_pottery_from_tables(load_toml_files(pottery_file, jobs), companies)
+
+
+def iter_pottery_from_tables(
+		tables: dict[str, Any],
+		companies: Mapping[str, Company] | None = None,
+		) -> Iterator[PotteryItem]:
+	"""
+	Create the items of a pottery collection from the tables of already parsed TOML files
+	(e.g. from :func:`~.read_collection`), yielding the items one at a time.
+
+	See :func:`~.iter_pottery_collection` for details.
+
+	:param tables: Mapping of item IDs to their tables. Each table is removed from the mapping once its item is created.
+	:param companies: Data about companies (see :func:`~.load_companies`). This mapping is not modified.
+	"""
+
+	interned_companies = dict(companies or {})
+	given_fields: dict[str, set[str]] = {}
+
+	# Items are yielded in file order.
+	for item_id in list(tables):
+		yield PotteryItem.from_toml_dict(item_id, interned_companies, given_fields, **tables.pop(item_id))
+
+
+def load_pottery_collection(
+		pottery_file: PathLike | Sequence[PathLike] = "pottery.toml",
+		jobs: int = 1,
+		companies: Mapping[str, Company] | None = None,
+		) -> list[PotteryItem]:
+	"""
+	Load a pottery collection from a TOML file.
+
+	:param pottery_file: The TOML file, or a sequence of shards (see :func:`~.get_toml_files`).
+	:param jobs: The number of processes to parse shards with.
+	:param companies: Data about companies (see :func:`~.load_companies`), for items to share.
+
+	:raises ValueError: If an item is defined in more than one shard.
+	"""
 
-	return pottery
+	return list(iter_pottery_collection(pottery_file, jobs, companies))
@@ -28,11 +28,13 @@ Map showing where items in a pottery collection were manufactured.
 
 # stdlib
 from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from operator import attrgetter
-from typing import NamedTuple
+from typing import TYPE_CHECKING, NamedTuple
 from urllib.parse import urlparse
 
 # 3rd party
+import attrs
 from branca.element import Figure  # nodep
 from domdf_folium_tools.elements import render_figure
 from domdf_python_tools.paths import PathPlus
@@ -40,25 +42,35 @@ from domdf_python_tools.typing import PathLike
 from folium_about_button import render_markdown
 
 # this package
-from pottery_map.companies import Companies, _get_item_count, load_companies
+from pottery_map import __version__
+from pottery_map.cache import BuildCache
+from pottery_map.collection_cache import CollectionCache
+from pottery_map.companies import Companies, load_companies_from_tables
 from pottery_map.dashboard import get_dashboard_data
+from pottery_map.downloads import PhotoDownloader, get_download_path
+from pottery_map.images import Derivative, ImageConverter, ImageSettings
+from pottery_map.manifest import BuildManifest, hash_data, hash_package_sources
 from pottery_map.map import make_map
-from pottery_map.pottery import PotteryItem, load_pottery_collection
-from pottery_map.templates import render_template
+from pottery_map.pottery import PotteryItem, iter_pottery_from_tables
+from pottery_map.schema import InvalidCollectionError, read_collection
+from pottery_map.templates import get_template_hash, render_template
 from pottery_map.utils import (
 		IMG_HEIGHT,
 		IMG_WIDTH,
-		FileModifications,
+		OutputWriter,
 		ProgressBar,
-		_convert_image,
 		copy_static_files,
-		get_photo_path,
+		get_toml_files,
 		groupby,
 		make_id,
 		normalise_category
 		)
 
-__all__ = ["PotteryMap", "SidebarData"]
+if TYPE_CHECKING:
+	# 3rd party
+	import requests  # nodep
+
+__all__ = ["Page", "PotteryMap", "SidebarData"]
 
 
 class SidebarData(NamedTuple):
@@ -70,16 +82,44 @@ class SidebarData(NamedTuple):
 	all_categories: tuple[str, ...]
 
 
+class Page(NamedTuple):
+	"""
+	An output page, and the inputs it is rendered from.
+	"""
+
+	#: The output filename, relative to the output directory.
+	filename: str
+
+	#: The name of the :class:`~.PotteryMap` method which renders the page.
+	renderer: str
+
+	#: Positional arguments for the renderer.
+	args: tuple[str, ...]
+
+	#: Mapping of input keys (e.g. ``item:<id>``) to the content hashes of those inputs.
+	dependencies: dict[str, str]
+
+	#: Whether the page may be rendered in a worker process.
+	parallel: bool = True
+
+
 class PotteryMap:
 	"""
 	Class for producing the pottery map website.
 
 	:param input_directory: Directory containing collection data files.
 	:param output_directory:
+	:param jobs: The number of processes to parse shards and render pages with, and threads to convert images with.
+	:param max_decoded_images: The maximum number of decoded images to hold in memory at once
+		when converting images. Defaults to ``jobs``.
+	:param image_settings: The sizes and formats photos are converted to.
 	"""
 
 	input_directory: PathPlus
 	output_directory: PathPlus
+	jobs: int
+	max_decoded_images: int | None
+	image_settings: ImageSettings
 	pottery: list[PotteryItem]
 	companies: Companies
 	has_notes: bool
@@ -88,14 +128,68 @@ class PotteryMap:
 	wishlist_markdown: str
 	category_data: dict[str, list[PotteryItem]]
 	sidebar_data: SidebarData
-
-	def __init__(self, input_directory: PathLike = '.', output_directory: PathLike = "output"):
+	placeholders: dict[str, str]
+
+	def __init__(
+			self,
+			input_directory: PathLike = '.',
+			output_directory: PathLike = "output",
+			jobs: int = 1,
+			max_decoded_images: int | None = None,
+			image_settings: ImageSettings | None = None,
+			):
 		self.input_directory = PathPlus(input_directory)
 		self.output_directory = PathPlus(output_directory)
+		self.jobs = jobs
+		self.max_decoded_images = max_decoded_images
+		self.image_settings = image_settings or ImageSettings()
+		self.placeholders = {}
+
+		self.load_collection()
+		self.load_markdown()
+
+	def load_collection(self) -> None:
+		"""
+		Load the pottery collection and company data from the input directory.
+
+		The data is read from ``pottery.toml`` and ``companies.toml``, and from any shards in the
+		``pottery.d`` and ``companies.d`` directories (see :func:`~.get_toml_files`).
+		Shards are parsed concurrently using :attr:`~.jobs` processes.
+
+		The files are validated against their schemas as they are parsed (see :func:`~.read_collection`),
+		and the collection is loaded from the same parsed tables.
+
+		:raises InvalidCollectionError: If the files do not match their schemas.
+
+		Called on initialisation, and again to pick up changes to the files.
+		The loaded collection is cached in :attr:`~.collection_cache_file`,
+		and reused while the files are unchanged.
+		The files are not validated again when the cache is used.
+		It is only saved once they have passed validation, and its key covers the content of every file
+		and the package's source code (including the schemas), so a hit means the same files already passed.
+		"""
+
+		pottery_files = get_toml_files(self.input_directory, "pottery")
+		companies_files = get_toml_files(self.input_directory, "companies")
 
-		self.pottery = load_pottery_collection(self.input_directory / "pottery.toml")
-		companies = load_companies(self.input_directory / "companies.toml")
-		self.companies = Companies.from_raw_data(self.pottery, companies)
+		# Earlier versions kept the cache in the output directory, where it would be deployed.
+		(self.output_directory / ".collection_cache.pickle").unlink(missing_ok=True)
+
+		cache = CollectionCache(self.collection_cache_file)
+		key = cache.get_key([*pottery_files, *companies_files])
+		collection = cache.load(key)  # Only saved for a valid collection, so needn't be validated again.
+
+		if collection is None:
+			tables, errors = read_collection(self.input_directory, self.jobs)
+			if errors:
+				raise InvalidCollectionError(errors)
+
+			companies = load_companies_from_tables(tables["companies"])
+			self.pottery = list(iter_pottery_from_tables(tables["pottery"], companies))
+			self.companies = Companies.from_raw_data(self.pottery, companies)
+			cache.save(key, (self.pottery, self.companies))
+		else:
+			self.pottery, self.companies = collection
 
 		self.category_data: dict[
 				str,
@@ -107,6 +201,13 @@ class PotteryMap:
 				all_categories=tuple(sorted(self.category_data.keys())),
 				)
 
+	def load_markdown(self) -> None:
+		"""
+		Load the notes and wishlist from the input directory.
+
+		Called on initialisation, and again to pick up changes to the files.
+		"""
+
 		# TODO: images directory to copy for notes and wishlist. Markdown extension to rewrite image paths and copy images.
 
 		try:
@@ -123,6 +224,58 @@ class PotteryMap:
 			self.wishlist_markdown = ''
 			self.has_wishlist = False
 
+	@property
+	def collection_cache_file(self) -> PathPlus:
+		"""
+		The :class:`~.CollectionCache` file, which stores the loaded collection.
+
+		The cache is unpickled when the collection is next loaded, so it is kept in the input directory
+		rather than in the output directory, which is served and deployed.
+		"""
+
+		return self.input_directory / ".cache" / "collection_cache.pickle"
+
+	@property
+	def cache_file(self) -> PathPlus:
+		"""
+		The :class:`~.BuildCache` database, which records the source files converted images were created from.
+		"""
+
+		return self.output_directory / ".build_cache.sqlite3"
+
+	def load_placeholders(self) -> None:
+		"""
+		Load the placeholder images of the collection's photos from the :class:`~.BuildCache`.
+
+		Placeholders are created when images are converted (see :meth:`~.copy_images`).
+		Photos which have not been converted yet have no placeholder.
+		"""
+
+		self.placeholders = {}
+
+		if not self.cache_file.is_file():
+			return
+
+		with BuildCache(self.cache_file) as cache:
+			for item in self.pottery:
+				for path in item.get_substituted_photo_paths():
+					derivatives = self.image_settings.get_derivatives(item, path, self.output_directory)
+					conversion = cache.get_conversion(derivatives[0].path.as_posix())
+					if conversion is None:
+						continue
+
+					placeholder = cache.get_placeholder(conversion.sha256)
+					if placeholder is not None:
+						self.placeholders[path] = placeholder
+
+	@property
+	def remote_photos_directory(self) -> PathPlus:
+		"""
+		The directory remote photos are downloaded to.
+		"""
+
+		return self.output_directory / ".remote_photos"
+
 	def render_page(self, template: str, **kwargs) -> str:
 		r"""
 		Render the template with the given filename with the given parameters.
@@ -136,6 +289,8 @@ class PotteryMap:
 				sidebar_data=self.sidebar_data,
 				has_notes=self.has_notes,
 				has_wishlist=self.has_wishlist,
+				image_settings=self.image_settings,
+				placeholders=self.placeholders,
 				**kwargs,
 				)
 
@@ -144,7 +299,12 @@ class PotteryMap:
 		Render the index page with the map.
 		"""
 
-		m = make_map(self.companies.pottery_by_company.values(), standalone=False)
+		m = make_map(
+				self.companies.pottery_by_company.values(),
+				standalone=False,
+				image_settings=self.image_settings,
+				placeholders=self.placeholders,
+				)
 
 		root: Figure = m.get_root()  # type: ignore[assignment]
 
@@ -211,7 +371,22 @@ class PotteryMap:
 		return self.render_page(
 				"company_index.jinja2",
 				companies=self.companies,
-				get_item_count=_get_item_count,
+				)
+
+	def render_company_page(self, company_name: str) -> str:
+		"""
+		Render the page for the given company.
+
+		:param company_name:
+		"""
+
+		company, items = self.companies.pottery_by_company[company_name]
+
+		return self.render_page(
+				"company_page.jinja2",
+				company=company,
+				companies=self.companies,
+				items=items,
 				)
 
 	def render_company_pages(self) -> Iterator[tuple[str, str]]:
@@ -219,16 +394,8 @@ class PotteryMap:
 		Render the pages for the companies.
 		"""
 
-		for (company, items) in self.companies.pottery_by_company.values():
-
-			html = self.render_page(
-					"company_page.jinja2",
-					company=company,
-					companies=self.companies,
-					items=items,
-					get_item_count=_get_item_count,
-					)
-			yield company.name, html
+		for company_name in self.companies.pottery_by_company:
+			yield company_name, self.render_company_page(company_name)
 
 	def render_categories_index(self) -> str:
 		"""
@@ -240,19 +407,165 @@ class PotteryMap:
 				category_data=self.category_data,
 				)
 
+	def render_category_page(self, category: str) -> str:
+		"""
+		Render the page for the given category.
+
+		:param category:
+		"""
+
+		return self.render_page(
+				"category_page.jinja2",
+				category=category,
+				items=sorted(self.category_data[category], key=attrgetter("design")),
+				)
+
 	def render_categories_pages(self) -> Iterator[tuple[str, str]]:
 		"""
 		Render the pages for the categories.
 		"""
 
-		for category, items in self.category_data.items():
+		for category in self.category_data:
+			yield category, self.render_category_page(category)
+
+	def get_pages(self) -> list[Page]:
+		"""
+		Returns the pages of the website, and the inputs each is rendered from.
+
+		Every page depends on the sidebar contents and on its template (including any templates it references).
+		Company and category pages additionally depend on the items (and companies) shown on them,
+		including the placeholders of the items' photos,
+		while pages summarising the whole collection depend on every item and company.
+		"""
+
+		item_hashes = {
+				item.id: hash_data([
+						attrs.asdict(item),
+						[self.placeholders.get(path) for path in item.get_substituted_photo_paths()],
+						])
+				for item in self.pottery
+				}
+		company_hashes = {
+				name: hash_data(attrs.asdict(company_items.company))
+				for name, company_items in self.companies.pottery_by_company.items()
+				}
+
+		site_hash = hash_data([
+				self.sidebar_data,
+				self.has_notes,
+				self.has_wishlist,
+				attrs.asdict(self.image_settings),
+				__version__,
+				hash_package_sources(),
+				])
+		collection_hash = hash_data([item_hashes, company_hashes])
+
+		# Each template (and those it references) is only read and hashed once per build.
+		template_hashes: dict[str, str] = {}
+
+		def dependencies(*templates: str, **inputs: str) -> dict[str, str]:
+			deps = {"site": site_hash}
+			for template in templates:
+				if template not in template_hashes:
+					template_hashes[template] = get_template_hash(template)
+				deps[f"template:{template}"] = template_hashes[template]
+			deps.update(inputs)
+			return deps
+
+		pages = [
+				# The map's element IDs come from branca's (seeded) random number generator,
+				# so it is always rendered in this process to keep them reproducible.
+				Page(
+						"index.html",
+						"render_index",
+						(),
+						dependencies("map.jinja2", "map_popup.jinja2", collection=collection_hash),
+						parallel=False,
+						),
+				Page(
+						"dashboard.html",
+						"render_dashboard",
+						(),
+						dependencies("dashboard.jinja2", collection=collection_hash),
+						),
+				Page(
+						"items.html",
+						"render_items_page",
+						(),
+						dependencies("items_page.jinja2", collection=collection_hash),
+						),
+				]
 
-			html = self.render_page(
-					"category_page.jinja2",
-					category=category,
-					items=sorted(items, key=attrgetter("design")),
+		if self.has_notes:
+			pages.append(
+					Page(
+							"notes.html",
+							"render_notes",
+							(),
+							dependencies("markdown_page.jinja2", markdown=hash_data(self.notes_markdown)),
+							),
+					)
+
+		if self.has_wishlist:
+			pages.append(
+					Page(
+							"wishlist.html",
+							"render_wishlist",
+							(),
+							dependencies("markdown_page.jinja2", markdown=hash_data(self.wishlist_markdown)),
+							),
+					)
+
+		for company_name, (company, items) in self.companies.pottery_by_company.items():
+			# The company tree shown on the page starts from the company's successor (if any).
+			related_companies: set[str] = set()
+			for root in self.companies.get_predecessors(company) or [company_name]:
+				related_companies.update(self.companies.get_group(root))
+
+			inputs = {f"company:{name}": company_hashes[name] for name in sorted(related_companies)}
+			inputs[f"company:{company_name}"] = company_hashes[company_name]
+			inputs.update({f"item:{item.id}": item_hashes[item.id] for item in items})
+
+			pages.append(
+					Page(
+							f"companies/{make_id(company_name)}.html",
+							"render_company_page",
+							(company_name, ),
+							dependencies("company_page.jinja2", **inputs),
+							),
+					)
+
+		pages.append(
+				Page(
+						"companies/index.html",
+						"render_companies_index",
+						(),
+						dependencies("company_index.jinja2", collection=collection_hash),
+						),
+				)
+
+		for category, items in self.category_data.items():
+			inputs = {f"item:{item.id}": item_hashes[item.id] for item in items}
+
+			pages.append(
+					Page(
+							f"categories/{make_id(category)}.html",
+							"render_category_page",
+							(category, ),
+							dependencies("category_page.jinja2", **inputs),
+							),
 					)
-			yield category, html
+
+		pages.append(
+				Page(
+						"categories/index.html",
+						"render_categories_index",
+						(),
+						dependencies("categories_index.jinja2", collection=collection_hash),
+						),
+				)
+
+		return pages
 
 	def prepare_output_directories(self) -> dict[str, PathPlus]:
 		"""
@@ -276,77 +589,228 @@ class PotteryMap:
 				"categories": categories_dir,
 				}
 
-	def copy_images(self) -> None:
-		"""
-		Copy required images into the output folder.
+	def get_photos_to_copy(self) -> list[tuple[PathPlus, list[Derivative]]]:
 		"""
+		Returns pairs of source paths and the images to convert them to, for the local photos of items in the collection.
 
-		image_hashes = FileModifications(self.output_directory / "images" / "hashes.json")
+		Remote photos are included if they are downloaded (see :attr:`ImageSettings.remote_photos <.ImageSettings.remote_photos>`),
+		with the path they are downloaded to as the source.
+		"""
 
-		photos_to_copy: list[tuple[PathPlus, PathPlus]] = []
+		photos_to_copy: list[tuple[PathPlus, list[Derivative]]] = []
 		for item in self.pottery:
 			for path in item.get_substituted_photo_paths():
 				parts = urlparse(path)
 				if not (parts.scheme and parts.netloc):
 					# Local filesystem path; will be copied into images/{id}
-					photos_to_copy.append((
-							self.input_directory / path,
-							self.output_directory / get_photo_path(item, path),
-							))
+					src_path = self.input_directory / path
+				elif self.image_settings.remote_photos:
+					src_path = get_download_path(self.remote_photos_directory, path)
+				else:
+					continue
 
-		if photos_to_copy:
-			progbar = ProgressBar(photos_to_copy, desc="Copying images")
+				photos_to_copy.append((
+						src_path,
+						self.image_settings.get_derivatives(item, path, self.output_directory),
+						))
 
-			src_path: PathPlus
-			dst_path: PathPlus
+		return photos_to_copy
 
-			for src_path, dst_path in progbar:
-				dst_path.parent.maybe_make(parents=True)
+	def get_remote_photo_urls(self) -> list[str]:
+		"""
+		Returns the URLs of the remote photos of items in the collection, without duplicates.
+		"""
 
-				if src_path.is_file():
-					if not image_hashes.has_file_changed(src_path):
-						# File hasn't changed
-						continue
+		urls: dict[str, None] = {}
+		for item in self.pottery:
+			for path in item.get_substituted_photo_paths():
+				parts = urlparse(path)
+				if parts.scheme and parts.netloc:
+					urls[path] = None
 
-					# progbar.write(f"{src_path.as_posix()} -> {dst_path.as_posix()}")
+		return list(urls)
 
-					img_ratio = _convert_image(src_path, dst_path)
-					if img_ratio != 4 / 3:
-						warning_msg = f"Warning: Image has wrong ratio ({img_ratio}; expected {IMG_WIDTH / IMG_HEIGHT}): {src_path.as_posix()}"
-						progbar.warning(warning_msg)
+	def download_remote_photos(self, session: "requests.Session | None" = None) -> None:
+		"""
+		Download remote photos into :attr:`~.remote_photos_directory`, so they can be converted like local photos.
+
+		Photos which have already been downloaded are checked for changes with conditional requests,
+		and are only downloaded again if they have changed.
+
+		:param session: The HTTP session to make requests with.
+		"""
+
+		urls = self.get_remote_photo_urls()
+
+		if urls:
+			progbar = ProgressBar(total=len(urls), desc="Downloading images")
+
+			with BuildCache(self.cache_file) as cache:
+				downloader = PhotoDownloader(self.remote_photos_directory, cache, session=session, jobs=self.jobs)
+
+				for result in downloader.download_all(urls):
+					progbar.update()
+
+					if result.exception is None:
+						continue
+					elif result.path.is_file():
+						progbar.warning(
+								f"Warning: Could not check image {result.url} for changes; using the previous download: {result.exception}"
+								)
 					else:
-						image_hashes.record_changed_file(src_path)
+						progbar.error(f"Error: Could not download image {result.url}: {result.exception}")
+
+			progbar.close()
+			progbar.report_errors_warnings("Complete. ")
+
+	def copy_images(self, session: "requests.Session | None" = None) -> None:
+		"""
+		Copy required images into the output folder.
+
+		Each image is converted to every size and format in :attr:`~.image_settings`.
+		Images are converted concurrently using :attr:`~.jobs` threads,
+		with at most :attr:`~.max_decoded_images` decoded images held in memory at once.
+		Images whose source is unchanged since they were last converted are skipped.
+
+		If :attr:`ImageSettings.remote_photos <.ImageSettings.remote_photos>` is enabled
+		remote photos are downloaded first (see :meth:`~.download_remote_photos`).
+
+		:param session: The HTTP session to download remote photos with.
+		"""
+
+		if self.image_settings.remote_photos:
+			self.download_remote_photos(session)
+
+		photos_to_copy = self.get_photos_to_copy()
+
+		if photos_to_copy:
+			progbar = ProgressBar(total=len(photos_to_copy), desc="Copying images")
+
+			photos_to_convert: list[tuple[PathPlus, list[Derivative]]] = []
+
+			for src_path, derivatives in photos_to_copy:
+				if src_path.is_file():
+					photos_to_convert.append((src_path, derivatives))
+				elif src_path.parent == self.remote_photos_directory:
+					# The download failed, which has already been reported.
+					progbar.update()
 				else:
 					progbar.error(f"Error: Image not found: {src_path.as_posix()}")
+					progbar.update()
+
+			with BuildCache(self.cache_file) as cache:
+				converter = ImageConverter(
+						jobs=self.jobs,
+						max_decoded_images=self.max_decoded_images,
+						cache=cache,
+						settings=self.image_settings,
+						)
+
+				for result in converter.convert_all(photos_to_convert):
+					progbar.update()
+
+					if result.up_to_date:
+						continue
+					elif result.exception is not None:
+						progbar.error(f"Error: Could not convert image {result.src_path.as_posix()}: {result.exception}")
+					elif result.ratio != 4 / 3:
+						warning_msg = f"Warning: Image has wrong ratio ({result.ratio}; expected {IMG_WIDTH / IMG_HEIGHT}): {result.src_path.as_posix()}"
+						progbar.warning(warning_msg)
+					else:
+						assert result.record is not None
+						cache.set_image(result.record)
 
-			image_hashes.write_file()
+			progbar.close()
 			progbar.report_errors_warnings("Complete. ")
 
-	def write_output(self) -> None:
+	def render_pages(self, pages: list[Page]) -> Iterator[tuple[Page, str]]:
+		"""
+		Render the given pages, yielding each page and its HTML as it completes.
+
+		If :attr:`~.jobs` is greater than one the pages are rendered concurrently in a pool of worker processes,
+		to which the collection is sent once when each worker starts.
+		Pages are then yielded in the order they finish rendering.
+
+		:param pages:
+		"""
+
+		if self.jobs <= 1 or len(pages) <= 1:
+			for page in pages:
+				yield page, getattr(self, page.renderer)(*page.args)
+			return
+
+		with ProcessPoolExecutor(
+				max_workers=self.jobs,
+				initializer=_init_worker,
+				initargs=(self, ),
+				) as executor:
+			futures = {
+					executor.submit(_render_page_in_worker, page.renderer, page.args): page
+					for page in pages if page.parallel
+					}
+
+			# Render the remaining pages here while the workers are busy.
+			for page in pages:
+				if not page.parallel:
+					yield page, getattr(self, page.renderer)(*page.args)
+
+			for future in as_completed(futures):
+				yield futures[future], future.result()
+
+	def write_output(self, force: bool = False) -> OutputWriter:
 		"""
 		Write the files for the pottery collection website.
+
+		Pages whose inputs are unchanged since the last build (according to the build manifest) are not re-rendered,
+		and files whose content is unchanged are not rewritten.
+
+		Photos' placeholders are inlined into the pages, so images should be converted first (see :meth:`~.copy_images`).
+
+		:param force: Re-render every page, even if its inputs are unchanged.
+
+		:returns: The writer, which counts the files written and left unchanged (see :meth:`OutputWriter.report`).
 		"""
 
 		directories = self.prepare_output_directories()
+		self.load_placeholders()
 
-		copy_static_files(directories["static"])
+		writer = OutputWriter()
+		copy_static_files(directories["static"], writer)
 
-		(self.output_directory / "index.html").write_clean(self.render_index())
-		self.output_directory.joinpath("dashboard.html").write_clean(self.render_dashboard())
-		self.output_directory.joinpath("items.html").write_clean(self.render_items_page())
+		manifest = BuildManifest(self.output_directory / ".build_manifest.json")
+		pages = self.get_pages()
 
-		if self.has_notes:
-			self.output_directory.joinpath("notes.html").write_clean(self.render_notes())
+		stale_pages = []
+		for page in pages:
+			output_file = self.output_directory / page.filename
 
-		if self.has_wishlist:
-			self.output_directory.joinpath("wishlist.html").write_clean(self.render_wishlist())
+			if force or not output_file.is_file() or not manifest.is_up_to_date(page.filename, page.dependencies):
+				stale_pages.append(page)
+
+		for page, html in self.render_pages(stale_pages):
+			writer.write_clean(self.output_directory / page.filename, html)
+			manifest.record(page.filename, page.dependencies)
+
+		# Delete pages which are no longer generated, e.g. for companies removed from the collection.
+		for filename in manifest.prune(page.filename for page in pages):
+			(self.output_directory / filename).unlink(missing_ok=True)
+
+		manifest.write_file()
+
+		# Pages which weren't re-rendered are unchanged too.
+		writer.unchanged += len(pages) - len(stale_pages)
+
+		return writer
+
+
+_worker_pottery_map: PotteryMap | None = None
 
-		for company, page_content in self.render_company_pages():
-			directories["companies"].joinpath(make_id(company) + ".html").write_clean(page_content)
 
-		directories["companies"].joinpath("index.html").write_clean(self.render_companies_index())
+def _init_worker(pottery_map: PotteryMap) -> None:
+	global _worker_pottery_map
+	_worker_pottery_map = pottery_map
 
-		for category, html in self.render_categories_pages():
-			directories["categories"].joinpath(f"{make_id(category)}.html").write_clean(html)
 
-		directories["categories"].joinpath("index.html").write_clean(self.render_categories_index())
+def _render_page_in_worker(renderer: str, args: tuple[str, ...]) -> str:
+	assert _worker_pottery_map is not None
+	return getattr(_worker_pottery_map, renderer)(*args)
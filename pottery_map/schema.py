@@ -27,12 +27,15 @@ Generate JSON schema for the TOML files.
 #
 
 # stdlib
+import functools
 import types
-from collections.abc import Sequence
-from typing import ClassVar, get_args, get_origin
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, ClassVar, NamedTuple, cast, get_args, get_origin
 
 # 3rd party
 import attrs
+import dom_toml
 from domdf_folium_tools import Coordinates
 from domdf_python_tools.paths import PathPlus
 from domdf_python_tools.typing import PathLike
@@ -41,8 +44,24 @@ from typing_extensions import NotRequired, Required, TypedDict
 # this package
 from pottery_map.company import Company
 from pottery_map.pottery import PotteryItem
-
-__all__ = ["Schema", "create_schemas", "dump_schema", "get_schema_property", "make_schema"]
+from pottery_map.utils import get_toml_files
+
+__all__ = [
+		"SCHEMA_CLASSES",
+		"InvalidCollectionError",
+		"Schema",
+		"SchemaError",
+		"compile_schema",
+		"create_schemas",
+		"dump_schema",
+		"get_schema_property",
+		"get_validator",
+		"make_schema",
+		"read_collection",
+		"validate_collection",
+		"validate_file",
+		"validate_tables",
+		]
 
 
 class PotteryMapAttrsInstance(attrs.AttrsInstance):
@@ -67,7 +86,7 @@ class Schema(TypedDict):
 	type: Required[str]
 	title: Required[str]
 	properties: NotRequired[dict[str, Property]]
-	additionalProperties: NotRequired["Schema"]
+	additionalProperties: NotRequired["Schema | bool"]
 	required: NotRequired[list[str]]
 
 
@@ -121,6 +140,7 @@ def make_schema(cls: type[PotteryMapAttrsInstance]) -> Schema:
 			"title": cls.__name__,
 			"properties": {},
 			"required": [],
+			"additionalProperties": False,
 			}
 
 	attribute: attrs.Attribute
@@ -152,6 +172,8 @@ def make_schema(cls: type[PotteryMapAttrsInstance]) -> Schema:
 				args = ()
 
 		if origin is Company:
+			# The company's name, with its other fields inline.
+			schema["properties"][attribute.name] = {"type": "string"}
 			schema["properties"].update(make_schema(origin)["properties"])
 			# schema_property["$ref"] = "companies.toml.schema.json"
 			# schema["properties"][attribute.name] = schema_property
@@ -209,3 +231,266 @@ def create_schemas(output_dir: PathLike = '.') -> list[PathPlus]:
 					output_dir=output_dir,
 					),
 			]
+
+
+#: The schemas for each kind of TOML file, by the name of the file without its extension.
+SCHEMA_CLASSES: dict[str, type[PotteryMapAttrsInstance]] = {
+		"companies": Company,  # type: ignore[dict-item]  # False positive despite Protocol
+		"pottery": PotteryItem,  # type: ignore[dict-item]  # False positive despite Protocol
+		}
+
+_JSON_TYPES: dict[str, tuple[type, ...]] = {
+		"string": (str, ),
+		"integer": (int, ),
+		"number": (int, float),
+		"boolean": (bool, ),
+		"array": (list, ),
+		"object": (dict, ),
+		}
+
+Validator = Callable[[Any], list[str]]
+
+
+def compile_schema(schema: Schema | Property) -> Validator:
+	"""
+	Compile the given schema into a function which returns the errors in a value, or an empty list if it is valid.
+
+	The schema is only inspected once, so validating many values against it is fast.
+	Only the subset of JSON Schema produced by :func:`~.make_schema` is supported.
+
+	:param schema:
+	"""
+
+	expected_types = _JSON_TYPES[schema["type"]]
+	checks: list[Validator] = []
+
+	if "items" in schema:
+		item_validator = compile_schema(schema["items"])  # type: ignore[typeddict-item]
+
+		def check_items(value: list) -> list[str]:
+			errors: list[str] = []
+			for index, item in enumerate(value):
+				errors.extend(f"[{index}]: {error}" for error in item_validator(item))
+			return errors
+
+		checks.append(check_items)
+
+	if "properties" in schema:
+		# Only object schemas have properties.
+		object_schema = cast(Schema, schema)
+		property_validators = {
+				name: compile_schema(property_schema)
+				for name, property_schema in object_schema["properties"].items()
+				}
+		required = object_schema.get("required", [])
+		additional_properties = object_schema.get("additionalProperties", True)
+
+		def check_properties(value: dict) -> list[str]:
+			errors = [f"Missing required key {name!r}" for name in required if name not in value]
+
+			for name, property_value in value.items():
+				if name in property_validators:
+					errors.extend(f"{name}: {error}" for error in property_validators[name](property_value))
+				elif additional_properties is False:
+					errors.append(f"Unknown key {name!r}")
+
+			return errors
+
+		checks.append(check_properties)
+
+	def validator(value: Any) -> list[str]:
+		# bool is a subclass of int, but isn't a valid integer.
+		if not isinstance(value, expected_types) or (isinstance(value, bool) and bool not in expected_types):
+			return [f"Expected {schema['type']}, got {type(value).__name__} {value!r}"]
+
+		errors: list[str] = []
+		for check in checks:
+			errors.extend(check(value))
+		return errors
+
+	return validator
+
+
+@functools.lru_cache(maxsize=None)
+def get_validator(kind: str) -> Validator:
+	"""
+	Returns the compiled schema (see :func:`~.compile_schema`) for tables in the given kind of TOML file.
+
+	Each schema is only compiled once per process.
+
+	:param kind: The name of the file without its extension, from :data:`~.SCHEMA_CLASSES`.
+	"""
+
+	return compile_schema(make_schema(SCHEMA_CLASSES[kind]))
+
+
+class SchemaError(NamedTuple):
+	"""
+	An error in a table of a TOML file.
+	"""
+
+	#: The TOML file, as a POSIX path.
+	filename: str
+
+	#: The name of the table, or an empty string if the error concerns the whole file.
+	table: str
+
+	message: str
+
+	def __str__(self) -> str:
+		if self.table:
+			return f"{self.filename}: [{self.table!r}] {self.message}"
+		else:
+			return f"{self.filename}: {self.message}"
+
+
+def validate_file(toml_file: PathLike, kind: str) -> tuple[dict[str, Any], list[SchemaError]]:
+	"""
+	Parse the given TOML file and validate its tables.
+
+	:param toml_file:
+	:param kind: The name of the file without its extension, from :data:`~.SCHEMA_CLASSES`.
+
+	:returns: The tables in the file (none if it could not be parsed), and any errors.
+	"""
+
+	tables, errors = _parse_file(toml_file)
+	if errors:
+		return tables, errors
+
+	return tables, validate_tables(PathPlus(toml_file).as_posix(), kind, tables)
+
+
+def validate_tables(filename: str, kind: str, tables: dict[str, Any]) -> list[SchemaError]:
+	"""
+	Validate tables from the given TOML file.
+
+	:param filename: The TOML file the tables were parsed from, as a POSIX path.
+	:param kind: The name of the file without its extension, from :data:`~.SCHEMA_CLASSES`.
+	:param tables: Some or all of the tables in the file.
+	"""
+
+	validator = get_validator(kind)
+	errors: list[SchemaError] = []
+
+	for table_name, table in tables.items():
+		errors.extend(SchemaError(filename, table_name, message) for message in validator(table))
+
+	return errors
+
+
+def _parse_file(toml_file: PathLike) -> tuple[dict[str, Any], list[SchemaError]]:
+	# Parse the given TOML file, without validating it.
+
+	try:
+		return dom_toml.load(toml_file), []
+	except Exception as e:  # E.g. a syntax error, or the file is missing.
+		return {}, [SchemaError(PathPlus(toml_file).as_posix(), '', f"Could not parse file: {e}")]
+
+
+def _parse_and_validate(
+		files: Sequence[tuple[PathLike, str]],
+		jobs: int,
+		) -> list[tuple[dict[str, Any], list[SchemaError]]]:
+	# Parse the files one per worker process, then split their tables into chunks to validate across the workers,
+	# so a collection in a single large file is still validated concurrently.
+
+	with ProcessPoolExecutor(max_workers=jobs) as executor:
+		if len(files) > 1:
+			parsed = list(executor.map(_parse_file, [toml_file for toml_file, kind in files]))
+		else:
+			parsed = [_parse_file(toml_file) for toml_file, kind in files]
+
+		# A few chunks per worker, to even out the load.
+		chunk_size = max(1, -(-sum(len(tables) for tables, _ in parsed) // (jobs * 4)))
+		chunks: list[tuple[int, str, str, dict[str, Any]]] = []
+
+		for file_idx, ((toml_file, kind), (tables, _)) in enumerate(zip(files, parsed)):
+			filename = PathPlus(toml_file).as_posix()
+			table_names = list(tables)
+			for start in range(0, len(table_names), chunk_size):
+				chunk = {name: tables[name] for name in table_names[start:start + chunk_size]}
+				chunks.append((file_idx, filename, kind, chunk))
+
+		# Chunks are in file and table order, so the errors are too.
+		chunk_errors = executor.map(
+				validate_tables,
+				[filename for _, filename, _, _ in chunks],
+				[kind for _, _, kind, _ in chunks],
+				[chunk for _, _, _, chunk in chunks],
+				)
+
+		for (file_idx, *_), errors in zip(chunks, chunk_errors):
+			parsed[file_idx][1].extend(errors)
+
+	return parsed
+
+
+def read_collection(input_directory: PathLike = '.', jobs: int = 1) -> tuple[dict[str, dict[str, Any]], list[SchemaError]]:
+	"""
+	Parse the collection's TOML files in the given directory, and validate them against their schemas.
+
+	This includes any shards (see :func:`~.get_toml_files`).
+	If ``jobs`` is greater than one the shards are parsed concurrently in a pool of worker processes,
+	and their tables are then validated in chunks across the same pool.
+	Every error is reported, rather than stopping at the first.
+
+	:param input_directory:
+	:param jobs: The number of processes to parse and validate files with.
+
+	:returns: The tables in each kind of file, merged across shards and keyed by the names in :data:`~.SCHEMA_CLASSES`,
+		and any errors. The tables should only be used if there are no errors.
+	"""
+
+	files = [(toml_file, kind) for kind in SCHEMA_CLASSES for toml_file in get_toml_files(input_directory, kind)]
+
+	if jobs > 1 and files:
+		results = _parse_and_validate(files, jobs)
+	else:
+		results = [validate_file(toml_file, kind) for toml_file, kind in files]
+
+	collection: dict[str, dict[str, Any]] = {kind: {} for kind in SCHEMA_CLASSES}
+	errors: list[SchemaError] = []
+	defined_in: dict[tuple[str, str], str] = {}
+
+	for (toml_file, kind), (tables, file_errors) in zip(files, results):
+		filename = PathPlus(toml_file).as_posix()
+		errors.extend(file_errors)
+
+		for table_name, table in tables.items():
+			if (kind, table_name) in defined_in:
+				message = f"Duplicate table (already defined in {defined_in[kind, table_name]})"
+				errors.append(SchemaError(filename, table_name, message))
+			else:
+				defined_in[kind, table_name] = filename
+				collection[kind][table_name] = table
+
+	return collection, errors
+
+
+def validate_collection(input_directory: PathLike = '.', jobs: int = 1) -> list[SchemaError]:
+	"""
+	Validate the collection's TOML files in the given directory against their schemas.
+
+	Every error is reported, rather than stopping at the first (see :func:`~.read_collection`).
+
+	:param input_directory:
+	:param jobs: The number of processes to validate files with.
+	"""
+
+	return read_collection(input_directory, jobs)[1]
+
+
+class InvalidCollectionError(ValueError):
+	"""
+	Raised when the collection's TOML files do not match their schemas.
+
+	:param errors:
+	"""
+
+	#: Every error found in the files.
+	errors: list[SchemaError]
+
+	def __init__(self, errors: list[SchemaError]):
+		self.errors = errors
+		super().__init__('\n'.join(map(str, errors)))
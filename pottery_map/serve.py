@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+#
+#  serve.py
+"""
+Development server which rebuilds the website when its inputs change.
+"""
+#
+#  Copyright © 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import os
+import threading
+import time
+import traceback
+from collections.abc import Iterable
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from pottery_map.pottery_map import PotteryMap
+
+__all__ = ["FileWatcher", "LiveReloadHandler", "ReloadNotifier", "rebuild", "serve"]
+
+#: URL path of the endpoint pages listen to for reload events.
+LIVERELOAD_PATH = "/__livereload"
+
+_livereload_script = f"""<script>
+new EventSource("{LIVERELOAD_PATH}").addEventListener("reload", () => location.reload());
+</script>
+"""
+
+
+class FileWatcher:
+	"""
+	Polls files and directories for changes.
+
+	:param paths: The files and directories to watch. Directories are watched recursively.
+	"""
+
+	def __init__(self, paths: Iterable[PathPlus] = ()):
+		self.paths: set[PathPlus] = set(paths)
+		self._state = self._snapshot()
+
+	def _snapshot(self) -> dict[PathPlus, tuple[float, int]]:
+		state = {}
+
+		for path in self.paths:
+			files = path.rglob('*') if path.is_dir() else [path]
+			for file in files:
+				try:
+					stat = file.stat()
+				except OSError:  # Deleted while iterating, or a broken link.
+					continue
+				state[file] = (stat.st_mtime, stat.st_size)
+
+		return state
+
+	def set_paths(self, paths: Iterable[PathPlus]) -> None:
+		"""
+		Replace the set of watched paths, without reporting the new paths as changed.
+
+		:param paths:
+		"""
+
+		paths = set(paths)
+		if paths != self.paths:
+			self.paths = paths
+			self._state = self._snapshot()
+
+	def changes(self) -> set[PathPlus]:
+		"""
+		Returns the files which have been created, modified or deleted since the last call.
+		"""
+
+		new_state = self._snapshot()
+		changed = {
+				path
+				for path in new_state.keys() | self._state.keys()
+				if new_state.get(path) != self._state.get(path)
+				}
+		self._state = new_state
+		return changed
+
+
+class ReloadNotifier:
+	"""
+	Tells open pages to reload once the website has been rebuilt.
+	"""
+
+	def __init__(self):
+		self._condition = threading.Condition()
+		self.generation = 0
+
+	def notify(self) -> None:
+		"""
+		Tell all listening pages to reload.
+		"""
+
+		with self._condition:
+			self.generation += 1
+			self._condition.notify_all()
+
+	def wait(self, generation: int, timeout: float) -> int:
+		"""
+		Wait until the website has been rebuilt since the given generation, or until the timeout expires.
+
+		:param generation: The generation the caller last saw.
+		:param timeout: The maximum time to wait, in seconds.
+
+		:returns: The current generation.
+		"""
+
+		with self._condition:
+			self._condition.wait_for(lambda: self.generation != generation, timeout=timeout)
+			return self.generation
+
+
+class LiveReloadHandler(SimpleHTTPRequestHandler):
+	"""
+	Serves the output directory, adding a script to HTML pages which reloads them after each rebuild.
+
+	:param notifier:
+	"""
+
+	def __init__(self, *args, notifier: ReloadNotifier, **kwargs):
+		self.notifier = notifier
+		super().__init__(*args, **kwargs)
+
+	def do_GET(self) -> None:  # noqa: D102
+		if self.path == LIVERELOAD_PATH:
+			self.send_reload_events()
+			return
+
+		path = self.translate_path(self.path)
+		if os.path.isdir(path) and self.path.endswith('/'):
+			path = os.path.join(path, "index.html")
+
+		if path.endswith(".html") and os.path.isfile(path):
+			self.send_html(PathPlus(path))
+		else:
+			super().do_GET()
+
+	def send_html(self, path: PathPlus) -> None:
+		"""
+		Send the given HTML file, with the live reload script added.
+
+		:param path:
+		"""
+
+		html = path.read_text()
+		if "</body>" in html:
+			html = html.replace("</body>", _livereload_script + "</body>", 1)
+		else:
+			html += _livereload_script
+
+		body = html.encode("UTF-8")
+		self.send_response(200)
+		self.send_header("Content-Type", "text/html; charset=utf-8")
+		self.send_header("Content-Length", str(len(body)))
+		self.send_header("Cache-Control", "no-store")
+		self.end_headers()
+		self.wfile.write(body)
+
+	def send_reload_events(self) -> None:
+		"""
+		Send a stream of server-sent events, with a ``reload`` event after each rebuild.
+		"""
+
+		self.send_response(200)
+		self.send_header("Content-Type", "text/event-stream")
+		self.send_header("Cache-Control", "no-store")
+		self.end_headers()
+
+		generation = self.notifier.generation
+
+		try:
+			while True:
+				new_generation = self.notifier.wait(generation, timeout=15)
+				if new_generation == generation:
+					# Keep the connection alive.
+					self.wfile.write(b": ping\n\n")
+				else:
+					generation = new_generation
+					self.wfile.write(b"event: reload\ndata: \n\n")
+				self.wfile.flush()
+		except (BrokenPipeError, ConnectionResetError):
+			pass
+
+	def log_message(self, format: str, *args: Any) -> None:  # noqa: A002  # pylint: disable=redefined-builtin
+		r"""
+		Log requests, except for the long-lived reload event stream.
+
+		:param format:
+		:param \*args:
+		"""
+
+		if LIVERELOAD_PATH not in self.requestline:
+			super().log_message(format, *args)
+
+
+def _get_watched_paths(pottery_map: PotteryMap) -> dict[str, set[PathPlus]]:
+	input_directory = pottery_map.input_directory
+	package_directory = PathPlus(__file__).parent
+
+	return {
+			"collection": {
+					input_directory / "pottery.toml",
+					input_directory / "pottery.d",
+					input_directory / "companies.toml",
+					input_directory / "companies.d",
+					},
+			"markdown": {input_directory / "notes.md", input_directory / "wishlist.md"},
+			"templates": {package_directory / "templates"},
+			"static": {package_directory / "static"},
+			"images": {src_path for src_path, _ in pottery_map.get_photos_to_copy()},
+			}
+
+
+def rebuild(pottery_map: PotteryMap, changed: set[PathPlus]) -> None:
+	"""
+	Rebuild the parts of the website affected by the given changed files.
+
+	Pages whose inputs are unchanged are not re-rendered (see :meth:`PotteryMap.write_output`),
+	and unchanged images are not converted again.
+
+	:param pottery_map:
+	:param changed: The files which have changed.
+	"""
+
+	watched = _get_watched_paths(pottery_map)
+
+	def affected(group: str) -> bool:
+		for path in changed:
+			for watched_path in watched[group]:
+				if path == watched_path or watched_path in path.parents:
+					return True
+		return False
+
+	if affected("collection"):
+		pottery_map.load_collection()
+	if affected("markdown"):
+		pottery_map.load_markdown()
+
+	if affected("collection") or affected("images"):
+		pottery_map.copy_images()
+
+	pottery_map.write_output()
+
+
+def serve(
+		pottery_map: PotteryMap,
+		host: str = "localhost",
+		port: int = 8000,
+		watch: bool = False,
+		interval: float = 0.5,
+		) -> None:
+	"""
+	Build the website and serve it over HTTP, optionally rebuilding it whenever its inputs change.
+
+	When watching, the collection, notes, wishlist, photos and the package's templates and static files are polled for changes.
+	The already loaded :class:`~.PotteryMap` is reused for each rebuild,
+	and open pages reload once the rebuild completes.
+
+	:param pottery_map:
+	:param host: The address to serve the website on.
+	:param port: The port to serve the website on.
+	:param watch: Whether to rebuild the website when its inputs change.
+	:param interval: How often to check for changes, in seconds.
+	"""
+
+	pottery_map.copy_images()
+	writer = pottery_map.write_output()
+	print(f"Website: {writer.report()}")
+
+	notifier = ReloadNotifier()
+	handler = partial(LiveReloadHandler, directory=str(pottery_map.output_directory), notifier=notifier)
+	server = ThreadingHTTPServer((host, port), handler)
+	server.daemon_threads = True
+
+	server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+	server_thread.start()
+	print(f"Serving {pottery_map.output_directory.as_posix()} at http://{host}:{port}/")
+
+	try:
+		if not watch:
+			server_thread.join()
+			return
+
+		watcher = FileWatcher(set().union(*_get_watched_paths(pottery_map).values()))
+
+		while True:
+			time.sleep(interval)
+			changed = watcher.changes()
+			if not changed:
+				continue
+
+			for path in sorted(changed):
+				print(f"Changed: {path.as_posix()}")
+
+			try:
+				rebuild(pottery_map, changed)
+			except Exception:
+				# Keep serving the last good build until the error is fixed.
+				traceback.print_exc()
+				continue
+
+			# Photos may have been added to or removed from the collection.
+			watcher.set_paths(set().union(*_get_watched_paths(pottery_map).values()))
+			notifier.notify()
+
+	except KeyboardInterrupt:
+		pass
+	finally:
+		server.shutdown()
+		server.server_close()
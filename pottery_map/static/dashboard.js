@@ -61,6 +61,71 @@ function formatTooltip(context) {
 	return label;
 }
 
+// The dimensions of the item cube, as shown in the list of filters.
+const cube_dimension_names = {
+	groups: 'Company Group',
+	areas: 'Area',
+	materials: 'Material',
+	categories: 'Category',
+	types: 'Type',
+};
+
+// Mapping of dimension names to the code of the label the items are filtered to.
+const cube_filters = {};
+
+// Count the items in the cube with each label of the given dimension,
+// applying the filters for every other dimension.
+function sliceCube(cube, dimension, filters) {
+	const stride = cube.dimensions.length + 1;
+	const index = cube.dimensions.indexOf(dimension);
+	const active_filters = Object.entries(filters)
+		.filter(([name]) => name !== dimension)
+		.map(([name, code]) => [cube.dimensions.indexOf(name), code]);
+
+	const counts = new Array(cube.labels[dimension].length).fill(0);
+
+	for (let i = 0; i < cube.cells.length; i += stride) {
+		if (active_filters.every(([filter_index, code]) => cube.cells[i + filter_index] === code)) {
+			counts[cube.cells[i + index]] += cube.cells[i + stride - 1];
+		}
+	}
+
+	return counts;
+}
+
+// Colour gradient from blue to green for the given values, as for the charts generated by the build.
+function gradientForData(data) {
+	const unique_values = [...new Set(data)].sort((a, b) => a - b);
+	const step = unique_values.length > 1 ? 1 / (unique_values.length - 1) : 0;
+
+	return data.map((value) => {
+		const position = unique_values.indexOf(value) * step;
+		return `rgb(0, ${Math.round(255 * position)}, ${Math.round(255 * (1 - position))})`;
+	});
+}
+
+function filterOnClick(dimension) {
+	return function(event, elements, chart) {
+		if (!elements.length) {
+			return;
+		}
+
+		// Labels not in the cube, e.g. areas whose factories made none of the items, can't be filtered on.
+		const code = item_cube.labels[dimension].indexOf(chart.data.labels[elements[0].index]);
+		if (code === -1) {
+			return;
+		}
+
+		if (cube_filters[dimension] === code) {
+			delete cube_filters[dimension];
+		} else {
+			cube_filters[dimension] = code;
+		}
+
+		updateCubeCharts();
+	};
+}
+
 const pie_datalabels_options = {
 	textStrokeColor: 'black',
 	textStrokeWidth: 2,
@@ -126,6 +191,7 @@ const pie_chart_tooltip_options = {
 };
 
 const groups_pie_chart_options = {
+	onClick: filterOnClick('groups'),
 	plugins: {
 		tooltip: pie_chart_tooltip_options,
 		title: {
@@ -168,6 +234,7 @@ const companies_bar_chart_options = {
 };
 
 const materials_pie_chart_options = {
+	onClick: filterOnClick('materials'),
 	plugins: {
 		tooltip: pie_chart_tooltip_options,
 		title: {
@@ -183,6 +250,7 @@ const materials_pie_chart_options = {
 };
 
 const types_bar_chart_options = {
+	onClick: filterOnClick('types'),
 	maintainAspectRatio: false,
 	aspectRatio: 1,
 	responsive: true,
@@ -210,6 +278,7 @@ const types_bar_chart_options = {
 };
 
 const areas_pie_chart_options = {
+	onClick: filterOnClick('areas'),
 	countType: 'factory',
 	countTypePlural: 'factories',
 	plugins: {
@@ -229,6 +298,7 @@ const areas_pie_chart_options = {
 };
 
 const categories_pie_chart_options = {
+	onClick: filterOnClick('categories'),
 	plugins: {
 		legend: { display: false },
 		tooltip: pie_chart_tooltip_options,
@@ -290,3 +360,62 @@ var categories_pie_chart = new Chart(categories_pie_chart_ctx, {
 	options: categories_pie_chart_options,
 	plugins: [ChartDataLabels],
 });
+
+// The charts counting items, which are redrawn from the item cube when filters are applied.
+// The areas chart counts factories rather than items, so it can filter the other charts but isn't redrawn.
+const cube_charts = {
+	groups: groups_pie_chart,
+	materials: materials_pie_chart,
+	types: types_bar_chart,
+	categories: categories_pie_chart,
+};
+
+const unfiltered_chart_data = Object.fromEntries(
+	Object.entries(cube_charts).map(([dimension, chart]) => [dimension, structuredClone(chart.data)]),
+);
+
+function updateCubeCharts() {
+	const filtered = Object.keys(cube_filters).length > 0;
+
+	for (const [dimension, chart] of Object.entries(cube_charts)) {
+		if (filtered) {
+			const counts = sliceCube(item_cube, dimension, cube_filters);
+			const sorted_counts = item_cube.labels[dimension]
+				.map((label, code) => [label, counts[code]])
+				.filter(([label, count]) => label && count > 0)
+				// "Other" goes last, as in the unfiltered charts.
+				.sort((a, b) => (a[0] === 'Other') - (b[0] === 'Other') || b[1] - a[1]);
+
+			chart.data.labels = sorted_counts.map(([label]) => label);
+			chart.data.datasets[0].data = sorted_counts.map(([, count]) => count);
+
+			if (chart.config.type === 'bar') {
+				chart.data.datasets[0].backgroundColor = gradientForData(chart.data.datasets[0].data);
+			}
+		} else {
+			chart.data = structuredClone(unfiltered_chart_data[dimension]);
+		}
+
+		chart.update();
+	}
+
+	updateFilterList();
+}
+
+function updateFilterList() {
+	const filter_list = document.getElementById('dashboard-filters');
+	filter_list.replaceChildren();
+
+	for (const [dimension, code] of Object.entries(cube_filters)) {
+		const button = document.createElement('button');
+		button.type = 'button';
+		button.className = 'btn btn-sm btn-outline-secondary';
+		button.title = 'Remove filter';
+		button.textContent = `${cube_dimension_names[dimension]}: ${item_cube.labels[dimension][code]} \u00d7`;
+		button.addEventListener('click', () => {
+			delete cube_filters[dimension];
+			updateCubeCharts();
+		});
+		filter_list.appendChild(button);
+	}
+}
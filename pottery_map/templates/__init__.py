@@ -28,10 +28,11 @@ Jinja2 templates.
 
 # stdlib
 import base64
+from hashlib import sha256
 
 # 3rd party
 import jinja2
-import networkx
+import jinja2.meta
 from domdf_python_tools.paths import PathPlus
 from jinja2 import Environment
 from jinja2_workarounds import MultiLineInclude  # type: ignore[import-untyped]
@@ -39,7 +40,7 @@ from jinja2_workarounds import MultiLineInclude  # type: ignore[import-untyped]
 # this package
 from pottery_map.utils import format_note, get_link_icon, make_id, normalise_category
 
-__all__ = ["base64_encode", "render_template"]
+__all__ = ["base64_encode", "get_referenced_templates", "get_template_hash", "render_template"]
 
 
 def base64_encode(value: str) -> str:
@@ -61,7 +62,6 @@ templates = Environment(  # nosec: B701
 templates.globals["make_id"] = make_id
 templates.globals["normalise_category"] = normalise_category
 templates.globals["github_url"] = "https://github.com/domdfcoding/pottery-map"
-templates.globals["networkx"] = networkx
 templates.globals["list"] = list
 templates.globals["sorted"] = sorted
 templates.globals["enumerate"] = enumerate
@@ -81,3 +81,44 @@ def render_template(template: str, **kwargs) -> str:
 	"""
 
 	return templates.get_template(template).render(**kwargs)
+
+
+def get_referenced_templates(template: str) -> set[str]:
+	"""
+	Returns the names of the given template and every template it extends, includes or imports, recursively.
+
+	:param template:
+	"""
+
+	found: set[str] = set()
+	to_visit = [template]
+
+	while to_visit:
+		name = to_visit.pop()
+		if name in found:
+			continue
+
+		found.add(name)
+		source, *_ = templates.loader.get_source(templates, name)  # type: ignore[union-attr]
+		for referenced in jinja2.meta.find_referenced_templates(templates.parse(source)):
+			if referenced is not None:
+				to_visit.append(referenced)
+
+	return found
+
+
+def get_template_hash(template: str) -> str:
+	"""
+	Returns the SHA256 hash hexdigest of the given template and every template it references.
+
+	:param template:
+	"""
+
+	hash_obj = sha256()
+
+	for name in sorted(get_referenced_templates(template)):
+		source, *_ = templates.loader.get_source(templates, name)  # type: ignore[union-attr]
+		hash_obj.update(name.encode("UTF-8"))
+		hash_obj.update(source.encode("UTF-8"))
+
+	return hash_obj.hexdigest()
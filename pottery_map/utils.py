@@ -27,25 +27,28 @@ Utility functions.
 #
 
 # stdlib
+import functools
+import os
 import re
-import shutil
 import warnings
 import xml.etree.ElementTree as etree
 from collections import defaultdict
-from collections.abc import Callable, Collection, Iterable
+from collections.abc import Callable, Collection, Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
 from hashlib import sha256
-from typing import TYPE_CHECKING, TypeVar
+from io import StringIO
+from typing import TYPE_CHECKING, Any, TypeVar
 from urllib.parse import urlparse
 
 # 3rd party
 import araokaat
-import domdf_folium_tools.static_files
+import dom_toml
 import markdown
 from consolekit.terminal_colours import Fore
-from domdf_python_tools.paths import PathPlus, TemporaryPathPlus
+from domdf_python_tools.compat import importlib_resources
+from domdf_python_tools.paths import PathPlus, clean_writer
 from domdf_python_tools.typing import PathLike
 from markdown.inlinepatterns import InlineProcessor
-from PIL import Image
 
 if TYPE_CHECKING:
 
@@ -53,7 +56,7 @@ if TYPE_CHECKING:
 	from pottery_map.pottery import PotteryItem
 
 __all__ = [
-		"FileModifications",
+		"OutputWriter",
 		"ProgressBar",
 		"copy_static_files",
 		"filter_keys",
@@ -61,7 +64,9 @@ __all__ = [
 		"get_link_icon",
 		"get_photo_path",
 		"get_sha256_hash",
+		"get_toml_files",
 		"groupby",
+		"load_toml_files",
 		"make_id",
 		"normalise_category",
 		]
@@ -72,37 +77,118 @@ IMG_WIDTH = 960
 IMG_HEIGHT = 720
 
 
+@functools.lru_cache(maxsize=None)
 def make_id(string: str) -> str:
 	"""
 	Make an ID for an HTML element from the given string.
 
+	The result is cached, as templates make IDs from the same company and category names many times.
+
 	:param string:
 	"""
 
 	return _id_regex.sub('_', string.lower())
 
 
-def copy_static_files(static_dir: PathPlus) -> None:
+class OutputWriter:
+	"""
+	Writes output files, leaving those whose content is unchanged untouched.
+
+	This preserves the modification times of unchanged files, so they are not needlessly re-uploaded or re-fetched.
+	"""
+
+	#: The number of files written.
+	written: int
+
+	#: The number of files left unchanged.
+	unchanged: int
+
+	def __init__(self):
+		self.written = 0
+		self.unchanged = 0
+
+	def write_clean(self, path: PathPlus, string: str) -> bool:
+		"""
+		Write the given string to the file, as with :meth:`PathPlus.write_clean`, unless its content is unchanged.
+
+		:param path:
+		:param string:
+
+		:returns: Whether the file was written.
+		"""
+
+		buffer = StringIO()
+		clean_writer(string, buffer)
+		content = buffer.getvalue()
+
+		try:
+			changed = path.read_text() != content
+		except (FileNotFoundError, UnicodeDecodeError):
+			changed = True
+
+		if changed:
+			path.write_text(content)
+
+		return self._count(changed)
+
+	def write_bytes(self, path: PathPlus, data: bytes) -> bool:
+		"""
+		Write the given bytes to the file, unless its content is unchanged.
+
+		:param path:
+		:param data:
+
+		:returns: Whether the file was written.
+		"""
+
+		try:
+			changed = path.read_bytes() != data
+		except FileNotFoundError:
+			changed = True
+
+		if changed:
+			path.write_bytes(data)
+
+		return self._count(changed)
+
+	def _count(self, changed: bool) -> bool:
+		if changed:
+			self.written += 1
+		else:
+			self.unchanged += 1
+
+		return changed
+
+	def report(self) -> str:
+		"""
+		Returns a summary of the number of files written and left unchanged.
+		"""
+
+		return f"{self.written} files written; {self.unchanged} unchanged."
+
+
+def copy_static_files(static_dir: PathPlus, writer: OutputWriter | None = None) -> None:
 	"""
 	Copy CSS and JS files into the given directory.
 
 	:param static_dir:
+	:param writer: Used to skip files which are unchanged.
 	"""
 
-	domdf_folium_tools.static_files.copy_static_files(
-			static_dir=static_dir,
-			js_files=[
-					domdf_folium_tools.static_files.PythonResource("pottery_map.static", "sidebar.js"),
-					domdf_folium_tools.static_files.PythonResource("pottery_map.static", "dashboard.js"),
-					domdf_folium_tools.static_files.PythonResource("pottery_map.static", "items_search.js"),
-					domdf_folium_tools.static_files.PythonResource("pottery_map.static", "map_popup.js"),
-					],
-			css_files=[
-					domdf_folium_tools.static_files.PythonResource("pottery_map.static", "pottery_map.css"),
-					domdf_folium_tools.static_files.PythonResource("pottery_map.static", "sidebar.css"),
-					domdf_folium_tools.static_files.PythonResource("pottery_map.static", "style.css"),
-					],
-			)
+	if writer is None:
+		writer = OutputWriter()
+
+	static_files = {
+			"js": ["sidebar.js", "dashboard.js", "items_search.js", "map_popup.js"],
+			"css": ["pottery_map.css", "sidebar.css", "style.css"],
+			}
+
+	for subdirectory, filenames in static_files.items():
+		(static_dir / subdirectory).maybe_make(parents=True)
+
+		for filename in filenames:
+			data = importlib_resources.read_binary("pottery_map.static", filename)
+			writer.write_bytes(static_dir / subdirectory / filename, data)
 
 
 _T1 = TypeVar("_T1")
@@ -130,10 +216,13 @@ def groupby(iterable: Iterable[_T1], key: Callable[[_T1], _T2]) -> dict[_T2, lis
 	return dict(grouper)
 
 
+@functools.lru_cache(maxsize=None)
 def normalise_category(category: str) -> str:
 	"""
 	Normalise a category name.
 
+	The result is cached, as there are far fewer categories than items.
+
 	:param category:
 	"""
 
@@ -177,24 +266,28 @@ def filter_keys(
 	return dict(new_dict)
 
 
-def get_photo_path(pottery_item: "PotteryItem", fileystem_path: PathLike) -> PathPlus:
+def get_photo_path(
+		pottery_item: "PotteryItem",
+		fileystem_path: PathLike,
+		width: int = IMG_WIDTH,
+		extension: str = ".webp",
+		) -> PathPlus:
 	"""
 	Returns the filesystem path (in the output directory) for the given item and image.
 
 	:param pottery_item:
-	:param fileystem_path: Path to the image.
+	:param fileystem_path: Path to the image, or its URL.
+	:param width: The width of the converted image.
+	:param extension: The file extension of the converted image, including the leading dot.
 	"""
 
-	file_name = PathPlus(fileystem_path).stem + f"_{IMG_WIDTH}px"
-	return (PathPlus("images") / pottery_item.id / file_name).with_suffix(".webp")
+	parts = urlparse(str(fileystem_path))
+	if parts.scheme and parts.netloc:
+		# A remote photo which has been downloaded
+		fileystem_path = parts.path
 
-
-def _convert_image(src_path: PathPlus, dst_path: PathPlus) -> float:
-	img = Image.open(src_path)
-	img_ratio = img.width / img.height
-	img.resize((IMG_WIDTH, IMG_HEIGHT)).save(dst_path)
-
-	return img_ratio
+	file_name = PathPlus(fileystem_path).stem + f"_{width}px"
+	return (PathPlus("images") / pottery_item.id / file_name).with_suffix(extension)
 
 
 def get_sha256_hash(filename: PathLike, blocksize: int = 1 << 20) -> str:
@@ -216,6 +309,71 @@ def get_sha256_hash(filename: PathLike, blocksize: int = 1 << 20) -> str:
 		return hash_obj.hexdigest()
 
 
+def get_toml_files(input_directory: PathLike, name: str) -> list[PathPlus]:
+	"""
+	Returns the TOML files with the given name in the input directory.
+
+	These are ``<name>.toml`` and the shards in the ``<name>.d`` directory (e.g. ``pottery.d/*.toml``),
+	in that order, with the shards sorted by filename.
+	Either may be omitted, although if neither exists ``<name>.toml`` is returned anyway.
+
+	:param input_directory:
+	:param name: The name of the file without its extension, e.g. ``pottery``.
+	"""
+
+	input_directory = PathPlus(input_directory)
+	main_file = input_directory / f"{name}.toml"
+	shards_directory = input_directory / f"{name}.d"
+
+	files = []
+
+	if main_file.is_file():
+		files.append(main_file)
+
+	if shards_directory.is_dir():
+		files.extend(sorted(shards_directory.glob("*.toml")))
+
+	return files or [main_file]
+
+
+def load_toml_files(toml_files: PathLike | Sequence[PathLike], jobs: int = 1) -> dict[str, Any]:
+	"""
+	Load the given TOML files and merge their top-level tables.
+
+	If ``jobs`` is greater than one the files are parsed concurrently in a pool of worker processes.
+
+	:param toml_files: A TOML file, or a sequence of TOML files (e.g. from :func:`~.get_toml_files`).
+	:param jobs: The number of processes to parse the files with.
+
+	:raises ValueError: If a table is defined in more than one file.
+	"""
+
+	if isinstance(toml_files, (str, os.PathLike)):
+		toml_files = [toml_files]
+
+	if jobs > 1 and len(toml_files) > 1:
+		with ProcessPoolExecutor(max_workers=min(jobs, len(toml_files))) as executor:
+			documents = list(executor.map(dom_toml.load, toml_files))
+	else:
+		documents = [dom_toml.load(filename) for filename in toml_files]
+
+	merged: dict[str, Any] = {}
+	defined_in: dict[str, PathLike] = {}
+
+	for filename, document in zip(toml_files, documents):
+		for key, value in document.items():
+			if key in merged:
+				raise ValueError(
+						f"Duplicate table {key!r} in {PathPlus(filename).as_posix()} "
+						f"(already defined in {PathPlus(defined_in[key]).as_posix()})"
+						)
+
+			merged[key] = value
+			defined_in[key] = filename
+
+	return merged
+
+
 class ProgressBar(araokaat.araokaat):  # noqa: PRM002
 	"""
 	Customised ``tqdm`` progressbar.
@@ -278,71 +436,6 @@ class ProgressBar(araokaat.araokaat):  # noqa: PRM002
 				self.write(message)
 
 
-# TODO: helper class for the following three hash/mtime functions
-
-
-class FileModifications:
-	"""
-	Helper class for tracking file modifications.
-
-	:param filename: The filename to read and store data to/from.
-	"""
-
-	_filename: PathPlus
-	_hashes: dict[str, tuple[float, str]]
-
-	def __init__(self, filename: PathLike):
-		self._filename = PathPlus(filename)
-
-		try:
-			self._hashes = self._filename.load_json()
-		except Exception:  # Whatever the cause; maybe log it?
-			self._hashes = {}
-
-	def has_file_changed(self, file: PathPlus) -> bool:
-		"""
-		Returns whether the file has changed by comparing its modifcation time and sha256 hash against the stored values.
-
-		:param file:
-		"""
-
-		if file.as_posix() in self._hashes:
-			last_mtime, last_hash = self._hashes[file.as_posix()]
-			if file.lstat().st_mtime == last_mtime:
-				# File hasn't changed
-				return False
-
-			if get_sha256_hash(file) == last_hash:
-				# File hasn't changed
-				return False
-
-		return True
-
-	def record_changed_file(self, file: PathPlus, write: bool = True) -> None:
-		"""
-		Record the file's current (new) modifcation time and sha256 hash.
-
-		:param file:
-		:param write: Write the changes to file now.
-		"""
-
-		self._hashes[file.as_posix()] = (file.lstat().st_mtime, get_sha256_hash(file))
-
-		if write:
-			self.write_file()
-
-	def write_file(self) -> None:
-		"""
-		Write the hashes and mtime data to disk.
-		"""
-
-		with TemporaryPathPlus() as tmpdir:
-			tmpfile = tmpdir / self._filename.name
-			tmpfile.dump_json(self._hashes, indent=2)
-			# tmpfile.rename(self._filename)  # Doesn't work across devices (drives)
-			shutil.copy2(tmpfile, self._filename)
-
-
 NS_COMPANIES = {"company", "companies"}
 
 
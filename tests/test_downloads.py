@@ -0,0 +1,157 @@
+# stdlib
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from pottery_map.cache import BuildCache
+from pottery_map.downloads import PhotoDownloader, get_download_path
+
+PHOTO = b"\xff\xd8\xff\xe0 not really a JPEG"
+ETAG = '"abc123"'
+LAST_MODIFIED = "Sat, 17 Oct 2026 12:00:00 GMT"
+
+
+class _PhotoHandler(BaseHTTPRequestHandler):
+	# Headers of each request received, shared between instances.
+	requests: list[dict[str, str]] = []
+
+	def do_GET(self) -> None:  # noqa: MAN002
+		_PhotoHandler.requests.append(dict(self.headers))
+
+		if self.path != "/photo.jpg":
+			self.send_error(404)
+			return
+
+		if self.headers.get("If-None-Match") == ETAG:
+			self.send_response(304)
+			self.end_headers()
+			return
+
+		self.send_response(200)
+		self.send_header("Content-Type", "image/jpeg")
+		self.send_header("Content-Length", str(len(PHOTO)))
+		self.send_header("ETag", ETAG)
+		self.send_header("Last-Modified", LAST_MODIFIED)
+		self.end_headers()
+		self.wfile.write(PHOTO)
+
+	def log_message(self, *args) -> None:  # noqa: MAN002
+		pass
+
+
+@pytest.fixture()
+def server_url() -> Iterator[str]:
+	_PhotoHandler.requests = []
+	server = ThreadingHTTPServer(("127.0.0.1", 0), _PhotoHandler)
+	thread = threading.Thread(target=server.serve_forever, daemon=True)
+	thread.start()
+
+	try:
+		yield f"http://127.0.0.1:{server.server_address[1]}"
+	finally:
+		server.shutdown()
+		server.server_close()
+
+
+@pytest.fixture()
+def tmp_pathplus(tmp_path: Path) -> PathPlus:
+	return PathPlus(tmp_path)
+
+
+@pytest.fixture()
+def cache(tmp_pathplus: PathPlus) -> Iterator[BuildCache]:
+	with BuildCache(tmp_pathplus / "cache.sqlite3") as cache:
+		yield cache
+
+
+def test_download(server_url: str, cache: BuildCache, tmp_pathplus: PathPlus) -> None:
+	downloader = PhotoDownloader(tmp_pathplus / "photos", cache)
+	url = f"{server_url}/photo.jpg"
+
+	result = downloader.download(url)
+	assert result.exception is None
+	assert not result.not_modified
+	assert result.path == downloader.get_path(url)
+	assert result.path.read_bytes() == PHOTO
+
+	record = cache.get_remote_photo(url)
+	assert record is not None
+	assert record.etag == ETAG
+	assert record.last_modified == LAST_MODIFIED
+
+
+def test_download_not_modified(server_url: str, cache: BuildCache, tmp_pathplus: PathPlus) -> None:
+	downloader = PhotoDownloader(tmp_pathplus / "photos", cache)
+	url = f"{server_url}/photo.jpg"
+
+	assert downloader.download(url).exception is None
+	mtime = downloader.get_path(url).stat().st_mtime_ns
+
+	result = downloader.download(url)
+	assert result.exception is None
+	assert result.not_modified
+
+	headers = _PhotoHandler.requests[-1]
+	assert headers["If-None-Match"] == ETAG
+	assert headers["If-Modified-Since"] == LAST_MODIFIED
+
+	# The existing download is left untouched.
+	assert result.path.read_bytes() == PHOTO
+	assert result.path.stat().st_mtime_ns == mtime
+
+
+def test_download_no_validators_without_file(server_url: str, cache: BuildCache, tmp_pathplus: PathPlus) -> None:
+	downloader = PhotoDownloader(tmp_pathplus / "photos", cache)
+	url = f"{server_url}/photo.jpg"
+
+	assert downloader.download(url).exception is None
+	downloader.get_path(url).unlink()
+
+	# The previous download is missing, so the photo must be downloaded again.
+	result = downloader.download(url)
+	assert not result.not_modified
+	assert "If-None-Match" not in _PhotoHandler.requests[-1]
+	assert result.path.read_bytes() == PHOTO
+
+
+def test_download_not_found(server_url: str, cache: BuildCache, tmp_pathplus: PathPlus) -> None:
+	downloader = PhotoDownloader(tmp_pathplus / "photos", cache)
+	url = f"{server_url}/missing.jpg"
+
+	result = downloader.download(url)
+	assert result.exception is not None
+	assert "404" in str(result.exception)
+	assert not result.path.exists()
+	assert cache.get_remote_photo(url) is None
+
+	# No partially downloaded file is left behind.
+	directory = tmp_pathplus / "photos"
+	assert not directory.exists() or not list(directory.iterdir())
+
+
+def test_download_all(server_url: str, cache: BuildCache, tmp_pathplus: PathPlus) -> None:
+	downloader = PhotoDownloader(tmp_pathplus / "photos", cache, jobs=2)
+	urls = [f"{server_url}/photo.jpg", f"{server_url}/missing.jpg"]
+
+	results = {result.url: result for result in downloader.download_all(urls)}
+	assert results.keys() == set(urls)
+	assert results[urls[0]].exception is None
+	assert results[urls[1]].exception is not None
+
+
+def test_get_download_path(tmp_pathplus: PathPlus) -> None:
+	url = "https://example.com/photos/Plate.JPG?size=large"
+	path = get_download_path(tmp_pathplus, url)
+
+	assert path.parent == tmp_pathplus
+	assert path.suffix == ".jpg"
+	assert path == get_download_path(tmp_pathplus, url)
+	# The filename must not change between versions, or every remote photo would be downloaded again.
+	assert path.name == "954dfd19d655bf822b9f40e85e15bf12.jpg"
+	assert get_download_path(tmp_pathplus, "https://example.com/photos/Bowl.JPG") != path